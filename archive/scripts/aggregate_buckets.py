@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Wenget Bucket Aggregator
+
+Combines several bucket manifests (URLs or local paths) into one manifest
+with source attribution, plus a compact name index, so clients fetch one
+file instead of N.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError, URLError
+from typing import Dict, List, Optional, Any, Tuple
+
+from atomic_json import write_json_atomic
+from validate_manifest import ManifestValidator
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# Configuration
+USER_AGENT = "Wenget-Bucket-Aggregator/1.0"
+DEFAULT_CACHE_DIR = ".bucket-cache"
+FETCH_WORKERS = 8
+
+
+class BucketFetcher:
+    """
+    Load bucket manifests from URLs or paths.
+
+    URLs are fetched with conditional requests; the last body and its
+    validators are kept under <cache-dir>/aggregate/ so a 304 reuses it.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = os.path.join(cache_dir, "aggregate")
+
+    def _cache_paths(self, url: str) -> Tuple[str, str]:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, digest)
+        return base + ".json", base + ".meta.json"
+
+    def _fetch_url(self, url: str) -> Tuple[Any, bool]:
+        """Return (manifest, from_cache)"""
+        body_file, meta_file = self._cache_paths(url)
+        meta = {}
+        if os.path.exists(meta_file) and os.path.exists(body_file):
+            with open(meta_file, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+
+        headers = {"User-Agent": USER_AGENT}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            with urlopen(Request(url, headers=headers), timeout=30) as response:
+                body = response.read()
+                meta = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+        except HTTPError as e:
+            if e.code == 304:
+                with open(body_file, "r", encoding="utf-8") as f:
+                    return json.load(f), True
+            raise
+
+        manifest = json.loads(body.decode("utf-8"))
+        write_json_atomic(body_file, manifest, indent=None)
+        write_json_atomic(meta_file, meta)
+        return manifest, False
+
+    def fetch(self, source: str) -> Tuple[Any, bool]:
+        """Return (manifest, from_cache) for a URL or local path"""
+        if source.startswith(("http://", "https://")):
+            return self._fetch_url(source)
+        with open(source, "r", encoding="utf-8") as f:
+            return json.load(f), False
+
+    def fetch_all(self, sources: List[str]) -> Dict[str, Any]:
+        """Fetch sources concurrently; failures are reported and left out"""
+        def load(source: str) -> Optional[Any]:
+            try:
+                manifest, cached = self.fetch(source)
+            except (HTTPError, URLError, OSError, ValueError) as e:
+                print(f"   ❌ {source}: {e}")
+                return None
+            print(f"   ✓ {source}{' (not modified)' if cached else ''}")
+            return manifest
+
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            manifests = list(executor.map(load, sources))
+
+        return {
+            source: manifest
+            for source, manifest in zip(sources, manifests)
+            if manifest is not None
+        }
+
+
+class BucketAggregator:
+    """
+    Merge bucket manifests.
+
+    Conflict rule: buckets are ranked by their position in the input list and
+    the first bucket providing a package name (or script name + type) wins.
+    Every merged entry gets a "bucket" field naming its source.
+    """
+
+    def __init__(self):
+        self.packages: List[Dict[str, Any]] = []
+        self.scripts: List[Dict[str, Any]] = []
+        self.buckets: List[Dict[str, Any]] = []
+        self.conflicts: List[str] = []
+
+    @staticmethod
+    def _script_key(script: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        return script.get("name", ""), script.get("script_type")
+
+    def add(self, source: str, manifest: Any):
+        """Merge one validated manifest"""
+        if isinstance(manifest, list):
+            manifest = {"packages": manifest}
+
+        package_owner = {pkg["name"]: pkg["bucket"] for pkg in self.packages}
+        script_owner = {self._script_key(s): s["bucket"] for s in self.scripts}
+        added_packages = added_scripts = 0
+
+        for package in manifest.get("packages", []):
+            name = package.get("name")
+            if name in package_owner:
+                self.conflicts.append(
+                    f"package '{name}' from {source} shadowed by {package_owner[name]}"
+                )
+                continue
+            merged = dict(package)
+            merged["bucket"] = source
+            self.packages.append(merged)
+            package_owner[name] = source
+            added_packages += 1
+
+        for script in manifest.get("scripts", []):
+            key = self._script_key(script)
+            if key in script_owner:
+                self.conflicts.append(
+                    f"script '{key[0]}' from {source} shadowed by {script_owner[key]}"
+                )
+                continue
+            merged = dict(script)
+            merged["bucket"] = source
+            self.scripts.append(merged)
+            script_owner[key] = source
+            added_scripts += 1
+
+        self.buckets.append({
+            "source": source,
+            "packages": added_packages,
+            "scripts": added_scripts,
+            "last_updated": manifest.get("last_updated"),
+        })
+
+    def manifest(self) -> Dict[str, Any]:
+        manifest_obj = {
+            "packages": self.packages,
+            "last_updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "buckets": self.buckets,
+        }
+        if self.scripts:
+            manifest_obj["scripts"] = self.scripts
+        return manifest_obj
+
+    def index(self) -> Dict[str, Any]:
+        """Compact name -> summary index for search without the full manifest"""
+        return {
+            "packages": {
+                pkg["name"]: {
+                    "bucket": pkg["bucket"],
+                    "description": pkg.get("description", ""),
+                    "platforms": sorted(pkg.get("platforms", {})),
+                }
+                for pkg in self.packages
+            },
+            "scripts": [
+                {
+                    "name": script.get("name"),
+                    "bucket": script["bucket"],
+                    "description": script.get("description", ""),
+                    "script_type": script.get("script_type"),
+                }
+                for script in self.scripts
+            ],
+        }
+
+
+def load_bucket_list(list_file: str) -> List[str]:
+    """Load bucket URLs/paths (one per line, # comments)"""
+    sources = []
+    with open(list_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                sources.append(line)
+    return sources
+
+
+def index_path(output_file: str) -> str:
+    root, ext = os.path.splitext(output_file)
+    return f"{root}.index{ext or '.json'}"
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Aggregate several Wenget bucket manifests into one"
+    )
+    parser.add_argument(
+        "buckets",
+        nargs="*",
+        help="Bucket manifest URLs or paths, highest priority first",
+    )
+    parser.add_argument(
+        "-l",
+        "--list",
+        help="File listing bucket manifest URLs or paths (one per line)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="aggregate.json",
+        help="Combined manifest file (default: aggregate.json); the index is "
+        "written next to it as <name>.index.json",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for conditional request cache (default: {DEFAULT_CACHE_DIR})",
+    )
+
+    args = parser.parse_args()
+
+    sources = load_bucket_list(args.list) if args.list else []
+    sources.extend(args.buckets)
+    if not sources:
+        print("❌ Error: No buckets given")
+        sys.exit(1)
+
+    print("🧺 Wenget Bucket Aggregator")
+    print("=" * 50)
+    print(f"\n📥 Fetching {len(sources)} bucket manifests...")
+    manifests = BucketFetcher(args.cache_dir).fetch_all(sources)
+
+    aggregator = BucketAggregator()
+    rejected = []
+    for source in sources:
+        if source not in manifests:
+            rejected.append(source)
+            continue
+        if not ManifestValidator(source, manifests[source]).validate():
+            rejected.append(source)
+            continue
+        aggregator.add(source, manifests[source])
+
+    write_json_atomic(args.output, aggregator.manifest())
+    write_json_atomic(index_path(args.output), aggregator.index())
+
+    print("=" * 50)
+    print("✅ Aggregation complete!")
+    print(f"   Buckets merged: {len(aggregator.buckets)}/{len(sources)}")
+    print(f"   Total packages: {len(aggregator.packages)}")
+    print(f"   Total scripts: {len(aggregator.scripts)}")
+    print(f"   Output file: {args.output} (+ {index_path(args.output)})")
+
+    if aggregator.conflicts:
+        print(f"\n⚠️  {len(aggregator.conflicts)} conflict(s), first bucket wins:")
+        for conflict in aggregator.conflicts:
+            print(f"   • {conflict}")
+
+    if rejected:
+        print(f"\n❌ {len(rejected)} bucket(s) skipped:")
+        for source in rejected:
+            print(f"   • {source}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
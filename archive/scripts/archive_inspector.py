@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Wenget Bucket Archive Inspector
+
+Lists the executables inside a release archive without downloading it:
+- .zip: reads only the end-of-central-directory record and the central
+  directory through HTTP Range requests
+- .tar.*: streams the archive through the decompressor, keeping only the
+  member headers (nothing is written to disk)
+"""
+
+import sys
+import stat
+import struct
+import tarfile
+import threading
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse, unquote
+from typing import Dict, List, Optional, Tuple
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+USER_AGENT = "Wenget-Bucket-Generator/1.0"
+
+# ZIP record layouts (little endian)
+EOCD_SIGNATURE = b"PK\x05\x06"
+EOCD_FORMAT = "<4sHHHHIIH"
+EOCD_SIZE = struct.calcsize(EOCD_FORMAT)  # 22
+EOCD_MAX_COMMENT = 0xFFFF
+ZIP_INITIAL_TAIL = 8192  # first tail read; enough unless the archive has a long comment
+ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+ZIP64_LOCATOR_FORMAT = "<4sIQI"
+ZIP64_LOCATOR_SIZE = struct.calcsize(ZIP64_LOCATOR_FORMAT)  # 20
+ZIP64_EOCD_FORMAT = "<4sQHHIIQQQQ"
+ZIP64_EOCD_SIZE = struct.calcsize(ZIP64_EOCD_FORMAT)  # 56
+CDIR_SIGNATURE = b"PK\x01\x02"
+CDIR_FORMAT = "<4sHHHHHHIIIHHHHHII"
+CDIR_SIZE = struct.calcsize(CDIR_FORMAT)  # 46
+
+TAR_MODES: Dict[str, str] = {
+    ".tar.gz": "r|gz",
+    ".tgz": "r|gz",
+    ".tar.xz": "r|xz",
+    ".txz": "r|xz",
+    ".tar.bz2": "r|bz2",
+    ".tbz2": "r|bz2",
+}
+
+# Files that are never the installable binary, even without an extension
+NON_BINARY_NAMES: set = {
+    "license", "licence", "copying", "readme", "changelog", "notice", "authors",
+}
+
+
+class _CountingReader:
+    """File-like wrapper counting the bytes read from a response"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.count += len(data)
+        return data
+
+
+class ArchiveInspector:
+    """
+    Discover executables inside remote release archives.
+
+    One inspector may serve several threads; bytes_read totals the bytes
+    downloaded by all of them.
+    """
+
+    def __init__(self, opener=urlopen):
+        self.opener = opener
+        self.bytes_read = 0
+        self._lock = threading.Lock()
+
+    # === HTTP ===
+
+    def _count(self, size: int):
+        with self._lock:
+            self.bytes_read += size
+
+    def _fetch_range(self, url: str, range_spec: str) -> bytes:
+        """Fetch a byte range; raises ValueError if the server ignores Range"""
+        req = Request(url, headers={"User-Agent": USER_AGENT, "Range": f"bytes={range_spec}"})
+        with self.opener(req, timeout=30) as response:
+            if response.status != 206:
+                # A full 200 response would mean downloading the whole archive
+                raise ValueError(f"Server does not support Range requests: {url}")
+            data = response.read()
+        self._count(len(data))
+        return data
+
+    # === CLASSIFICATION ===
+
+    @staticmethod
+    def _looks_executable(path: str, mode: Optional[int]) -> bool:
+        """Decide whether an archive member is an executable"""
+        basename = path.rstrip("/").split("/")[-1]
+        if not basename or path.endswith("/"):
+            return False
+        if basename.lower().endswith(".exe"):
+            return True
+        if mode is not None:
+            return stat.S_ISREG(mode) and bool(mode & 0o111)
+        # No permission info: extensionless files that are not docs
+        return "." not in basename and basename.lower() not in NON_BINARY_NAMES
+
+    @staticmethod
+    def _binary_entry(path: str) -> Dict[str, str]:
+        basename = path.split("/")[-1]
+        name = basename[:-4] if basename.lower().endswith(".exe") else basename
+        return {"name": name, "path": path}
+
+    # === ZIP ===
+
+    def _parse_eocd(self, url: str, tail: bytes, tail_offset: int) -> Tuple[int, int]:
+        """Return (central directory offset, size) from the archive tail"""
+        pos = tail.rfind(EOCD_SIGNATURE)
+        if pos < 0 or len(tail) - pos < EOCD_SIZE:
+            raise ValueError("End of central directory not found")
+        (_, _, _, _, _, cd_size, cd_offset, _) = struct.unpack(
+            EOCD_FORMAT, tail[pos:pos + EOCD_SIZE]
+        )
+
+        if cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF:
+            # ZIP64: the locator sits right before the EOCD record
+            loc_pos = pos - ZIP64_LOCATOR_SIZE
+            if loc_pos < 0 or tail[loc_pos:loc_pos + 4] != ZIP64_LOCATOR_SIGNATURE:
+                raise ValueError("ZIP64 locator not found")
+            _, _, zip64_offset, _ = struct.unpack(
+                ZIP64_LOCATOR_FORMAT, tail[loc_pos:pos]
+            )
+            rel = zip64_offset - tail_offset
+            if rel >= 0:
+                record = tail[rel:rel + ZIP64_EOCD_SIZE]
+            else:
+                record = self._fetch_range(
+                    url, f"{zip64_offset}-{zip64_offset + ZIP64_EOCD_SIZE - 1}"
+                )
+            fields = struct.unpack(ZIP64_EOCD_FORMAT, record[:ZIP64_EOCD_SIZE])
+            cd_size, cd_offset = fields[8], fields[9]
+
+        return cd_offset, cd_size
+
+    def _parse_central_directory(self, data: bytes) -> List[Tuple[str, Optional[int]]]:
+        """Return (path, unix mode or None) for every central directory entry"""
+        members = []
+        pos = 0
+        while pos + CDIR_SIZE <= len(data) and data[pos:pos + 4] == CDIR_SIGNATURE:
+            fields = struct.unpack(CDIR_FORMAT, data[pos:pos + CDIR_SIZE])
+            version_made_by, flags = fields[1], fields[3]
+            name_len, extra_len, comment_len = fields[10], fields[11], fields[12]
+            external_attr = fields[15]
+
+            raw_name = data[pos + CDIR_SIZE:pos + CDIR_SIZE + name_len]
+            name = raw_name.decode("utf-8" if flags & 0x800 else "cp437", errors="replace")
+            # Host system 3 = Unix: permission bits live in the high word
+            mode = external_attr >> 16 if version_made_by >> 8 == 3 and external_attr >> 16 else None
+            members.append((name, mode))
+
+            pos += CDIR_SIZE + name_len + extra_len + comment_len
+        return members
+
+    def inspect_zip(self, url: str, size: int) -> List[Dict[str, str]]:
+        max_tail = EOCD_SIZE + EOCD_MAX_COMMENT + ZIP64_LOCATOR_SIZE
+        tail_len = min(size, ZIP_INITIAL_TAIL)
+        tail = self._fetch_range(url, f"-{tail_len}")
+        if tail.rfind(EOCD_SIGNATURE) < 0 and size > tail_len:
+            # Long archive comment: fetch the largest possible tail
+            tail_len = min(size, max_tail)
+            tail = self._fetch_range(url, f"-{tail_len}")
+        tail_offset = size - tail_len
+
+        cd_offset, cd_size = self._parse_eocd(url, tail, tail_offset)
+        if cd_offset >= tail_offset:
+            directory = tail[cd_offset - tail_offset:cd_offset - tail_offset + cd_size]
+        else:
+            directory = self._fetch_range(url, f"{cd_offset}-{cd_offset + cd_size - 1}")
+
+        return [
+            self._binary_entry(path)
+            for path, mode in self._parse_central_directory(directory)
+            if self._looks_executable(path, mode)
+        ]
+
+    # === TAR ===
+
+    def inspect_tar(self, url: str, mode: str) -> List[Dict[str, str]]:
+        req = Request(url, headers={"User-Agent": USER_AGENT})
+        binaries = []
+        with self.opener(req, timeout=60) as response:
+            reader = _CountingReader(response)
+            try:
+                # Stream mode: member data is decompressed and skipped, never stored
+                with tarfile.open(fileobj=reader, mode=mode) as archive:
+                    for member in archive:
+                        path = member.name[2:] if member.name.startswith("./") else member.name
+                        if member.isfile() and self._looks_executable(path, member.mode | stat.S_IFREG):
+                            binaries.append(self._binary_entry(path))
+            finally:
+                self._count(reader.count)
+        return binaries
+
+    # === ENTRY POINT ===
+
+    def inspect(self, url: str, size: int) -> Optional[List[Dict[str, str]]]:
+        """
+        Return [{"name", "path"}] for the executables in the asset at url,
+        or None if the format cannot be inspected.
+        """
+        filename = unquote(urlparse(url).path.rstrip("/").split("/")[-1])
+        filename_lower = filename.lower()
+
+        if filename_lower.endswith(".exe"):
+            return [self._binary_entry(filename)]
+        if filename_lower.endswith(".zip"):
+            return self.inspect_zip(url, size)
+        for ext, mode in TAR_MODES.items():
+            if filename_lower.endswith(ext):
+                return self.inspect_tar(url, mode)
+        return None
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="List executables inside a remote release archive"
+    )
+    parser.add_argument("url", help="Asset URL")
+    parser.add_argument("size", type=int, help="Asset size in bytes (from the release listing)")
+
+    args = parser.parse_args()
+
+    inspector = ArchiveInspector()
+    try:
+        binaries = inspector.inspect(args.url, args.size)
+    except (HTTPError, URLError, OSError, ValueError, tarfile.TarError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if binaries is None:
+        print("⚠️  Unsupported archive format")
+        sys.exit(1)
+
+    for binary in binaries:
+        print(f"   {binary['name']}: {binary['path']}")
+    print(f"ℹ️  Read {inspector.bytes_read:,} of {args.size:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
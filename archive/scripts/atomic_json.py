@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Wenget Bucket JSON Files
+
+Atomic JSON writing shared by the generator, aggregator, mirror builder and
+coverage index: readers (e.g. serve_manifest.py) never see a half-written
+file.
+"""
+
+import os
+import json
+from typing import Any, Optional
+
+
+def write_json_atomic(path: str, data: Any, indent: Optional[int] = 2, sort_keys: bool = False):
+    """Write JSON to a temp file and atomically replace path"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, sort_keys=sort_keys, ensure_ascii=False)
+    os.replace(tmp_path, path)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Wenget Bucket Coverage Index
+
+Compact platform coverage index of a manifest: platform keys are interned
+to bit positions and every package gets one integer bitset. Coverage
+questions (which packages lack a platform, which have all of a set, counts
+per platform) become integer operations instead of nested dict scans.
+"""
+
+import os
+import sys
+import json
+from typing import Dict, List, Any
+
+from atomic_json import write_json_atomic
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+INDEX_VERSION = 1
+
+
+def coverage_path(manifest_file: str) -> str:
+    """Coverage index file written next to a manifest (<name>.coverage.json)"""
+    root, ext = os.path.splitext(manifest_file)
+    return f"{root}.coverage{ext or '.json'}"
+
+
+def index_is_current(index_file: str, manifest_file: str) -> bool:
+    """Whether index_file exists and is not older than manifest_file"""
+    if not os.path.exists(index_file):
+        return False
+    if not os.path.exists(manifest_file):
+        return True
+    # The generator writes the index right after the manifest
+    return os.path.getmtime(index_file) >= os.path.getmtime(manifest_file)
+
+
+class CoverageIndex:
+    """
+    Platform bitsets per package.
+
+    platforms[i] is the platform key of bit i (sorted, so the layout is
+    stable for a given set of keys); packages maps a package name to the OR
+    of the bits of the platforms it provides.
+    """
+
+    def __init__(self, platforms: List[str], packages: Dict[str, int]):
+        self.platforms = list(platforms)
+        self.bits = {platform: i for i, platform in enumerate(self.platforms)}
+        self.packages = packages
+        self._columns: Dict[int, int] = {}
+
+    @classmethod
+    def from_manifest(cls, manifest: Any) -> "CoverageIndex":
+        packages = manifest.get("packages", []) if isinstance(manifest, dict) else manifest
+        platforms = sorted({key for pkg in packages for key in pkg.get("platforms", {})})
+        bits = {platform: 1 << i for i, platform in enumerate(platforms)}
+
+        bitsets: Dict[str, int] = {}
+        for pkg in packages:
+            bitset = 0
+            for key in pkg.get("platforms", {}):
+                bitset |= bits[key]
+            # Duplicate names (rejected by the validator) share one bitset
+            bitsets[pkg["name"]] = bitsets.get(pkg["name"], 0) | bitset
+        return cls(platforms, bitsets)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CoverageIndex":
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported coverage index version: {data.get('version')}")
+        return cls(data["platforms"], data["packages"])
+
+    @classmethod
+    def load(cls, path: str) -> "CoverageIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": INDEX_VERSION, "platforms": self.platforms, "packages": self.packages}
+
+    # === BITS ===
+
+    def mask(self, platforms: List[str]) -> int:
+        """Bitset of platform keys; raises KeyError for keys no package provides"""
+        mask = 0
+        for platform in platforms:
+            if platform not in self.bits:
+                raise KeyError(platform)
+            mask |= 1 << self.bits[platform]
+        return mask
+
+    def decode(self, bitset: int) -> List[str]:
+        """Platform keys of a bitset"""
+        return [platform for i, platform in enumerate(self.platforms) if bitset >> i & 1]
+
+    def _column(self, bit: int) -> int:
+        """Bitset over package positions (transposed view of one platform)"""
+        if bit not in self._columns:
+            column = 0
+            for position, bitset in enumerate(self.packages.values()):
+                if bitset >> bit & 1:
+                    column |= 1 << position
+            self._columns[bit] = column
+        return self._columns[bit]
+
+    # === QUERIES ===
+
+    def counts(self) -> Dict[str, int]:
+        """Number of packages providing each platform"""
+        return {
+            platform: bin(self._column(i)).count("1")
+            for i, platform in enumerate(self.platforms)
+        }
+
+    def total(self) -> int:
+        """Number of (package, platform) entries"""
+        return sum(bin(bitset).count("1") for bitset in self.packages.values())
+
+    def having_all(self, platforms: List[str]) -> List[str]:
+        """Packages providing every one of platforms (intersection)"""
+        mask = self.mask(platforms)
+        return [name for name, bitset in self.packages.items() if bitset & mask == mask]
+
+    def having_any(self, platforms: List[str]) -> List[str]:
+        """Packages providing at least one of platforms (union)"""
+        mask = self.mask(platforms)
+        return [name for name, bitset in self.packages.items() if bitset & mask]
+
+    def missing(self, platforms: List[str]) -> Dict[str, List[str]]:
+        """Packages lacking some of platforms, with the platforms they lack"""
+        # Unknown keys are missing everywhere rather than an error
+        known = [p for p in platforms if p in self.bits]
+        unknown = [p for p in platforms if p not in self.bits]
+        mask = self.mask(known)
+        result = {}
+        for name, bitset in self.packages.items():
+            lacking = (bitset & mask) ^ mask
+            if lacking or unknown:
+                result[name] = self.decode(lacking) + unknown
+        return result
+
+    def platforms_of(self, name: str) -> List[str]:
+        return self.decode(self.packages[name])
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query Wenget bucket platform coverage")
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        default="manifest.json",
+        help="Manifest file; its <name>.coverage.json index is used when present "
+        "and not older than the manifest (default: manifest.json)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("counts", help="Packages per platform")
+
+    missing = subparsers.add_parser("missing", help="Packages lacking any of the platforms")
+    missing.add_argument("platforms", nargs="+", help="Platform keys, e.g. linux-aarch64-musl")
+
+    having = subparsers.add_parser("having", help="Packages providing all of the platforms")
+    having.add_argument("platforms", nargs="+", help="Platform keys")
+    having.add_argument("--any", action="store_true", help="Any of the platforms instead of all")
+
+    show = subparsers.add_parser("show", help="Platforms of a package")
+    show.add_argument("package", help="Package name")
+
+    subparsers.add_parser("build", help="(Re)write the coverage index next to the manifest")
+
+    args = parser.parse_args()
+
+    index_file = coverage_path(args.manifest)
+    if args.command != "build" and index_is_current(index_file, args.manifest):
+        index = CoverageIndex.load(index_file)
+    else:
+        if args.command != "build" and os.path.exists(index_file):
+            print(f"⚠️  {index_file} is older than {args.manifest}, reading the manifest")
+        with open(args.manifest, "r", encoding="utf-8") as f:
+            index = CoverageIndex.from_manifest(json.load(f))
+
+    try:
+        if args.command == "build":
+            write_json_atomic(index_file, index.to_dict())
+            print(f"💾 Coverage index saved to {index_file}")
+
+        elif args.command == "counts":
+            for platform, count in sorted(index.counts().items()):
+                print(f"   {platform}: {count} packages")
+            print(f"ℹ️  {len(index.packages)} packages, {index.total()} platform binaries")
+
+        elif args.command == "missing":
+            lacking = index.missing(args.platforms)
+            for name, platforms in lacking.items():
+                print(f"   {name}: {', '.join(platforms)}")
+            print(f"ℹ️  {len(lacking)}/{len(index.packages)} packages lack a requested platform")
+
+        elif args.command == "having":
+            names = index.having_any(args.platforms) if args.any else index.having_all(args.platforms)
+            for name in names:
+                print(f"   {name}")
+            print(f"ℹ️  {len(names)}/{len(index.packages)} packages")
+
+        elif args.command == "show":
+            print(f"   {args.package}: {', '.join(index.platforms_of(args.package))}")
+
+    except KeyError as e:
+        print(f"❌ Unknown platform or package: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,22 @@ import sys
 import json
 import re
 import time
+import calendar
+import hashlib
+import heapq
+import subprocess
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from urllib.request import Request, urlopen
 from urllib.error import HTTPError, URLError
-from typing import Dict, List, Optional, Any
+from urllib.parse import unquote, urlparse
+from typing import Collection, Dict, List, Optional, Any, Tuple, Union
+
+from archive_inspector import ArchiveInspector
+from atomic_json import write_json_atomic
+from coverage_index import CoverageIndex, coverage_path
+from history_store import HistoryStore
 
 # Fix Windows console encoding
 if sys.platform == "win32":
@@ -23,76 +36,353 @@ if sys.platform == "win32":
 
 # Configuration
 GITHUB_API_BASE = "https://api.github.com"
+GITHUB_WEB_BASE = "https://github.com"  # releases.atom feeds (not counted against API quota)
+FEED_WORKERS = 8
 RATE_LIMIT_DELAY = 1  # seconds between requests
-MAX_RETRIES = 3
-RETRY_DELAY = 5  # seconds
+MAX_RETRIES = 3  # attempts per source before falling back to the previous manifest
+RETRY_DELAY = 5  # seconds, doubled on every further attempt
+CIRCUIT_FAILURE_THRESHOLD = 3  # consecutive failures before a host's circuit opens
+CIRCUIT_COOLDOWN = 60  # seconds before an open circuit lets a trial request through
+DEFAULT_CACHE_DIR = ".bucket-cache"
+REQUESTS_PER_REPO = 2  # repo info + latest release
+METADATA_TTL_DAYS = 30  # days repo metadata is reused before it is fetched again
+RELEASES_PER_PAGE = 100  # maximum page size of the releases listing
+QUOTA_RESERVE = 10  # requests left untouched when deriving a budget from quota
+
+
+def history_path(manifest_file: str) -> str:
+    """Release history written next to a manifest (<name>.history.json)"""
+    root, ext = os.path.splitext(manifest_file)
+    return f"{root}.history{ext or '.json'}"
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse a GitHub ISO 8601 timestamp (e.g. 2024-01-31T12:00:00Z) to epoch seconds"""
+    return float(calendar.timegm(time.strptime(value, "%Y-%m-%dT%H:%M:%SZ")))
+
+
+def parse_budget(value: str) -> Union[int, str]:
+    """argparse type of --budget: a non-negative request count or "auto" """
+    import argparse
+
+    if value == "auto":
+        return value
+    try:
+        budget = int(value)
+    except ValueError:
+        budget = -1
+    if budget < 0:
+        raise argparse.ArgumentTypeError(
+            f"expected a number of requests or 'auto', got {value!r}"
+        )
+    return budget
+
+
+class TransientError(Exception):
+    """A failure worth retrying later (network error, 5xx, rate limit, open circuit)"""
+
+
+class CircuitOpenError(TransientError):
+    """The host's circuit is open; the request was not attempted"""
+
+
+class NotFoundError(ValueError):
+    """The requested resource does not exist (HTTP 404)"""
+
+
+class NoReleasesError(ValueError):
+    """The repository exists but has no usable (non-draft) release"""
+
+
+class HostCircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After CIRCUIT_FAILURE_THRESHOLD consecutive failures a host's circuit
+    opens and requests to it fail fast with CircuitOpenError. Once
+    CIRCUIT_COOLDOWN has passed a single trial request is let through; success
+    closes the circuit, failure keeps it open for another cooldown.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown: float = CIRCUIT_COOLDOWN,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures: Dict[str, int] = {}
+        self.opened_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def check(self, url: str):
+        """Raise CircuitOpenError if url's host is cooling down"""
+        host = urlparse(url).netloc
+        with self._lock:
+            opened_at = self.opened_at.get(host)
+            if opened_at is None:
+                return
+            if time.time() - opened_at < self.cooldown:
+                raise CircuitOpenError(f"Circuit open for {host}")
+            # Half-open: let this request through as a trial
+            self.opened_at[host] = time.time()
+
+    def record_success(self, url: str):
+        host = urlparse(url).netloc
+        with self._lock:
+            self.failures[host] = 0
+            if self.opened_at.pop(host, None) is not None:
+                print(f"   🔌 Circuit closed for {host}")
+
+    def record_failure(self, url: str):
+        host = urlparse(url).netloc
+        with self._lock:
+            self.failures[host] = self.failures.get(host, 0) + 1
+            if self.failures[host] >= self.failure_threshold and host not in self.opened_at:
+                self.opened_at[host] = time.time()
+                print(f"   🔌 Circuit opened for {host} ({self.failures[host]} consecutive failures)")
+
+    def urlopen(self, req: Request, timeout: float = 30, passthrough: Tuple[int, ...] = ()):
+        """
+        urlopen through the breaker; host-level failures raise TransientError.
+
+        HTTP errors with a status in passthrough are re-raised unrecorded;
+        the caller decides whether they count as a host failure.
+        """
+        url = req.full_url
+        self.check(url)
+        try:
+            response = urlopen(req, timeout=timeout)
+        except HTTPError as e:
+            if e.code in passthrough:
+                raise
+            if e.code >= 500 or e.code == 429:
+                self.record_failure(url)
+                raise TransientError(f"HTTP Error {e.code}: {e.reason}") from e
+            # Client errors say nothing about the host's health
+            self.record_success(url)
+            raise
+        except (URLError, OSError) as e:
+            self.record_failure(url)
+            raise TransientError(f"Network error: {getattr(e, 'reason', e)}") from e
+        self.record_success(url)
+        return response
+
+
+class TokenState:
+    """Quota bookkeeping of one token (None = anonymous access)"""
+
+    def __init__(self, token: Optional[str]):
+        self.token = token
+        self.remaining: Optional[int] = None  # unknown until the first response
+        self.reset: Optional[float] = None
+        self.blocked_until: Optional[float] = None  # secondary rate limit (Retry-After)
+
+    @property
+    def label(self) -> str:
+        return f"token …{self.token[-4:]}" if self.token else "anonymous"
+
+
+class TokenPool:
+    """
+    Pool of GitHub tokens with per-token quota tracking.
+
+    Every request goes to the token with the most remaining quota; tokens
+    with an exhausted quota are skipped until their reset time, tokens hit
+    by a secondary rate limit only for the Retry-After delay. Thread-safe,
+    so concurrent requests spread over the pool.
+    """
+
+    ASSUMED_QUOTA = 5000  # headroom assumed for a token before its first response
+    SECONDARY_BACKOFF = 60  # seconds benched after a secondary limit without Retry-After
+
+    def __init__(self, tokens: List[Optional[str]]):
+        self.states = [TokenState(token) for token in (tokens or [None])]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def _headroom(self, state: TokenState, now: float) -> int:
+        if state.blocked_until is not None and state.blocked_until > now:
+            return 0
+        if state.remaining is None:
+            return self.ASSUMED_QUOTA
+        if state.remaining <= 0 and state.reset is not None and state.reset <= now:
+            return self.ASSUMED_QUOTA  # quota has been reset since
+        return state.remaining
+
+    def acquire(self, exclude: Optional[List[TokenState]] = None) -> TokenState:
+        """Pick the token with the most headroom; raises TransientError if all are exhausted"""
+        now = time.time()
+        with self._lock:
+            candidates = [s for s in self.states if not exclude or s not in exclude]
+            best = max(candidates, key=lambda s: self._headroom(s, now), default=None)
+            if best is None or self._headroom(best, now) <= 0:
+                resets = [
+                    s.blocked_until if s.blocked_until and s.blocked_until > now else s.reset
+                    for s in self.states
+                ]
+                resets = [reset for reset in resets if reset]
+                wait = f", next reset in {max(int(min(resets) - now), 0)}s" if resets else ""
+                raise TransientError(f"All {len(self.states)} token(s) exhausted{wait}")
+            # Reserve one request so concurrent callers spread over the pool
+            if best.remaining is not None:
+                best.remaining -= 1
+            return best
+
+    def update(self, state: TokenState, headers):
+        """Record quota headers of a response made with state's token"""
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        with self._lock:
+            if remaining is not None:
+                state.remaining = int(remaining)
+            if reset is not None:
+                state.reset = float(reset)
+
+    def mark_exhausted(self, state: TokenState, headers=None, secondary: bool = False):
+        """
+        Bench state after a rate limit response. A secondary limit (flagged
+        by the caller, or a Retry-After while quota remains) benches it for
+        Retry-After seconds only; a primary limit until X-RateLimit-Reset.
+        """
+        headers = headers if headers is not None else {}
+        retry_after = headers.get("Retry-After")
+        if secondary or (retry_after is not None and headers.get("X-RateLimit-Remaining") != "0"):
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = self.SECONDARY_BACKOFF
+            with self._lock:
+                state.blocked_until = time.time() + delay
+            return
+
+        reset = headers.get("X-RateLimit-Reset")
+        with self._lock:
+            state.remaining = 0
+            if reset is not None:
+                state.reset = float(reset)
+            elif state.reset is None:
+                state.reset = time.time() + 3600  # primary quota window
+
+    def total_remaining(self) -> Optional[int]:
+        known = [s.remaining for s in self.states if s.remaining is not None]
+        return sum(known) if known else None
 
 
 class GitHubAPI:
     """Simple GitHub API client"""
 
-    def __init__(self, token: Optional[str] = None):
-        self.token = token or os.environ.get("GITHUB_TOKEN")
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        breaker: Optional[HostCircuitBreaker] = None,
+        tokens: Optional[List[str]] = None,
+    ):
+        """
+        token/tokens: one token or a pool of tokens. Without either, tokens
+        come from GITHUB_TOKENS (comma separated) and GITHUB_TOKEN.
+        """
+        pool = list(tokens or [])
+        if token:
+            pool.insert(0, token)
+        if not pool:
+            pool = [t.strip() for t in os.environ.get("GITHUB_TOKENS", "").split(",") if t.strip()]
+            if os.environ.get("GITHUB_TOKEN"):
+                pool.append(os.environ["GITHUB_TOKEN"])
+        # Keep order, drop duplicates
+        self.tokens = TokenPool(list(dict.fromkeys(pool)))
+        self.breaker = breaker or HostCircuitBreaker()
         self.rate_limit_remaining = None
         self.rate_limit_reset = None
 
-    def _make_request(self, url: str) -> Dict[str, Any]:
-        """Make HTTP request to GitHub API"""
-        headers = {
-            "Accept": "application/vnd.github.v3+json",
-            "User-Agent": "Wenget-Bucket-Generator/1.0",
-        }
+    def _make_request(self, url: str, token_state: Optional[TokenState] = None) -> Dict[str, Any]:
+        """
+        Make a single HTTP request to GitHub API.
+
+        The request uses the pool token with the most headroom (or
+        token_state if given) and fails over to the next token when a token's
+        quota is exhausted. Retrying is left to the caller: network errors,
+        5xx responses and rate limiting on every token raise TransientError.
+        """
+        return self._request(url, token_state)[0]
+
+    def _request(
+        self,
+        url: str,
+        token_state: Optional[TokenState] = None,
+        etag: Optional[str] = None,
+    ) -> Tuple[Any, Any]:
+        """
+        _make_request returning (data, response headers). With etag the
+        request is conditional and a 304 returns (None, headers).
+        """
+        tried: List[TokenState] = []
+        while True:
+            try:
+                state = token_state or self.tokens.acquire(exclude=tried)
+            except TransientError:
+                if tried:
+                    # Failed over until the pool ran out: that is a host failure
+                    self.breaker.record_failure(url)
+                raise
+            tried.append(state)
 
-        if self.token:
-            headers["Authorization"] = f"token {self.token}"
+            headers = {
+                "Accept": "application/vnd.github.v3+json",
+                "User-Agent": "Wenget-Bucket-Generator/1.0",
+            }
+
+            if state.token:
+                headers["Authorization"] = f"token {state.token}"
+            if etag:
+                headers["If-None-Match"] = etag
 
-        req = Request(url, headers=headers)
+            req = Request(url, headers=headers)
 
-        for attempt in range(MAX_RETRIES):
             try:
-                with urlopen(req, timeout=30) as response:
+                # Rate limiting is per token: handled below, not by the breaker
+                with self.breaker.urlopen(req, timeout=30, passthrough=(403, 429)) as response:
                     # Update rate limit info
-                    self.rate_limit_remaining = response.headers.get(
-                        "X-RateLimit-Remaining"
-                    )
+                    self.tokens.update(state, response.headers)
+                    self.rate_limit_remaining = self.tokens.total_remaining()
                     self.rate_limit_reset = response.headers.get("X-RateLimit-Reset")
 
                     data = json.loads(response.read().decode("utf-8"))
-                    return data
+                    return data, response.headers
 
             except HTTPError as e:
-                if e.code == 403:
+                if e.code == 304:
+                    # Not modified: GitHub does not count it against the quota
+                    self.tokens.update(state, e.headers)
+                    return None, e.headers
+                if e.code in (403, 429):
                     # Check if it's actually rate limit or permission issue
                     error_body = e.read().decode('utf-8') if hasattr(e, 'read') else ''
-                    if 'rate limit' in error_body.lower() or self.rate_limit_remaining == '0':
-                        print(f"⚠️  Rate limit exceeded. Remaining: {self.rate_limit_remaining}")
-                        print(f"   Waiting {RETRY_DELAY}s before retry...")
-                    else:
-                        print(f"⚠️  Permission denied (403): {url}")
-                        print(f"   This might be a private resource or authentication issue")
-
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY)
-                    else:
-                        raise
+                    if 'rate limit' in error_body.lower() or e.headers.get("X-RateLimit-Remaining") == '0':
+                        secondary = 'secondary rate limit' in error_body.lower()
+                        self.tokens.mark_exhausted(state, e.headers, secondary=secondary)
+                        if token_state is None and len(tried) < len(self.tokens):
+                            print(f"⚠️  Rate limit exceeded for {state.label}, switching token")
+                            continue
+                        print(f"⚠️  Rate limit exceeded. Remaining: {self.tokens.total_remaining()}")
+                        # Only an exhausted pool counts as a host failure
+                        self.breaker.record_failure(url)
+                        raise TransientError(f"Rate limit exceeded: {url}") from e
+                    if e.code == 429:
+                        self.breaker.record_failure(url)
+                        raise TransientError(f"HTTP Error 429: {e.reason}") from e
+                    self.breaker.record_success(url)
+                    print(f"⚠️  Permission denied (403): {url}")
+                    print(f"   This might be a private resource or authentication issue")
+                    raise
                 elif e.code == 404:
-                    raise ValueError(f"Repository not found: {url}")
+                    raise NotFoundError(f"Repository not found: {url}")
                 else:
                     print(f"❌ HTTP Error {e.code}: {e.reason}")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY)
-                    else:
-                        raise
-
-            except URLError as e:
-                print(f"❌ Network error: {e.reason}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY)
-                else:
                     raise
 
-        raise Exception(f"Failed after {MAX_RETRIES} attempts")
-
     def get_repo_info(self, owner: str, repo: str) -> Dict[str, Any]:
         """Get repository information"""
         url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}"
@@ -103,10 +393,73 @@ class GitHubAPI:
         url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/releases/latest"
         return self._make_request(url)
 
+    def list_releases(
+        self,
+        owner: str,
+        repo: str,
+        max_releases: int,
+        cache: Optional["ReleasePageCache"] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        List the newest max_releases releases (newest first, drafts included).
+
+        The first page tells how many pages exist (Link rel="last"); the
+        remaining pages are fetched concurrently. With cache, every page is
+        requested conditionally and a 304 reuses the cached page.
+        """
+        base = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/releases?per_page={RELEASES_PER_PAGE}"
+
+        def fetch_page(page: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+            url = f"{base}&page={page}"
+            cached = cache.get(url) if cache else None
+            data, headers = self._request(url, etag=cached["etag"] if cached else None)
+            if data is None:
+                return cached["releases"], cached.get("link")
+            releases = [ReleasePageCache.slim(release) for release in data]
+            link = headers.get("Link")
+            if cache and headers.get("ETag"):
+                cache.put(url, {"etag": headers["ETag"], "link": link, "releases": releases})
+            return releases, link
+
+        releases, link = fetch_page(1)
+        last_page = 1
+        match = re.search(r'[?&]page=(\d+)>;\s*rel="last"', link or "")
+        if match:
+            last_page = int(match.group(1))
+        pages = min(max(-(-max_releases // RELEASES_PER_PAGE), 1), last_page)
+
+        if pages > 1:
+            with ThreadPoolExecutor(max_workers=min(FEED_WORKERS, pages - 1)) as executor:
+                for page_releases, _ in executor.map(fetch_page, range(2, pages + 1)):
+                    releases.extend(page_releases)
+
+        return releases[:max_releases]
+
+    def get_core_quota(self) -> Tuple[int, int]:
+        """
+        Return (remaining, earliest reset epoch) of the core quota summed over
+        the token pool (/rate_limit itself is free)
+        """
+        remaining, resets = 0, []
+        for state in self.tokens.states:
+            core = self._make_request(f"{GITHUB_API_BASE}/rate_limit", token_state=state)["resources"]["core"]
+            state.remaining, state.reset = int(core["remaining"]), float(core["reset"])
+            remaining += state.remaining
+            resets.append(int(core["reset"]))
+        self.rate_limit_remaining = remaining
+        return remaining, min(resets)
+
     def check_rate_limit(self):
         """Print rate limit status"""
-        if self.rate_limit_remaining:
-            print(f"ℹ️  Rate limit: {self.rate_limit_remaining} remaining")
+        if self.rate_limit_remaining is not None:
+            if len(self.tokens) > 1:
+                detail = ", ".join(
+                    f"{s.label}: {s.remaining if s.remaining is not None else '?'}"
+                    for s in self.tokens.states
+                )
+                print(f"ℹ️  Rate limit: {self.rate_limit_remaining} remaining ({detail})")
+            else:
+                print(f"ℹ️  Rate limit: {self.rate_limit_remaining} remaining")
 
 
 class PlatformDetector:
@@ -215,6 +568,14 @@ class PlatformDetector:
         "freebsd": {"": 1},
     }
 
+    # Build variant keyword -> penalty (profiling/debug builds are never preferred)
+    VARIANT_PENALTIES: Dict[str, int] = {
+        "profile": 10,
+        "debug": 10,
+        "dbg": 10,
+        "symbols": 10,
+    }
+
     # Default architecture when not specified in filename
     ARCH_DEFAULTS: Dict[str, Optional[str]] = {
         "windows": "x86_64",
@@ -305,6 +666,12 @@ class PlatformDetector:
                 return compiler
         return ""
 
+    @classmethod
+    def _extract_variants(cls, filename: str) -> List[str]:
+        """Extract penalized build variant keywords (profile, debug, ...) from filename."""
+        tokens = re.split(r"[-_.]", filename.lower())
+        return [token for token in tokens if token in cls.VARIANT_PENALTIES]
+
     # === MAIN DETECTION METHODS ===
 
     @classmethod
@@ -366,14 +733,842 @@ class PlatformDetector:
         platform_priorities = cls.COMPILER_PRIORITY.get(platform, {"": 1})
         return platform_priorities.get(compiler, 1)
 
+    @classmethod
+    def score_asset(cls, filename: str, platform_key: str) -> Tuple[int, int]:
+        """
+        Score an asset for selection among candidates of the same platform key.
+
+        Scores compare as tuples (higher = preferred):
+            1. Variant penalty - profile/debug/symbols builds lose to normal builds
+            2. Compiler priority - see get_asset_priority()
+        Ties keep release order; size only decides between archive formats of
+        the same build (see build_name()).
+        """
+        penalty = sum(cls.VARIANT_PENALTIES[v] for v in cls._extract_variants(filename))
+        priority = cls.get_asset_priority(filename, platform_key)
+        return (-penalty, priority)
+
+    @classmethod
+    def build_name(cls, filename: str) -> str:
+        """
+        Filename without its archive/executable extension. Assets sharing a
+        build name are the same build in different formats (e.g. .zip and
+        .tar.gz); deno and denort, or bun and bun-baseline, are not.
+        """
+        extension = cls._extract_extension(filename)
+        name = filename.lower()
+        return name[:-len(extension)] if extension else name
+
+    @classmethod
+    def describe_score(cls, filename: str, score: Tuple[int, int], size: int) -> str:
+        """Human readable explanation of a score_asset() result."""
+        penalty, priority = score
+        parts = [f"priority {priority}", f"{size:,} bytes"]
+        variants = cls._extract_variants(filename)
+        if variants:
+            parts.insert(0, f"penalty {-penalty} ({', '.join(variants)})")
+        return ", ".join(parts)
+
+
+class RefreshState:
+    """
+    Per-repo refresh bookkeeping persisted between runs.
+
+    Each repo key ("owner/repo", lowercase) maps to:
+        last_success - epoch seconds of the last successful fetch
+        tag          - latest release tag seen
+        releases     - publish times (epoch seconds) of distinct releases seen
+        feed_*       - releases.atom validators, newest feed tag seen (and its
+                       <updated>) and the feed tag at the time of the last
+                       successful fetch
+    """
+
+    MAX_RELEASE_HISTORY = 20
+
+    def __init__(self, path: str):
+        self.path = path
+        self.repos: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.repos = json.load(f).get("repos", {})
+
+    def get(self, key: str) -> Dict[str, Any]:
+        return self.repos.get(key, {})
+
+    def record_success(self, key: str, release: Dict[str, Any], now: Optional[float] = None):
+        """Record a successful fetch of key's latest release"""
+        entry = self.repos.setdefault(key, {})
+        entry["last_success"] = now if now is not None else time.time()
+        if "feed_latest" in entry:
+            entry["feed_tag"] = entry["feed_latest"]
+
+        tag = release.get("tag_name")
+        if tag and tag != entry.get("tag"):
+            entry["tag"] = tag
+            published_at = release.get("published_at")
+            if published_at:
+                releases = entry.setdefault("releases", [])
+                releases.append(parse_timestamp(published_at))
+                del releases[:-self.MAX_RELEASE_HISTORY]
+
+    def record_unchanged(self, key: str, now: Optional[float] = None):
+        """Record a check that confirmed nothing changed since the last fetch"""
+        self.repos.setdefault(key, {})["last_success"] = now if now is not None else time.time()
+
+    def release_rate(self, key: str) -> Optional[float]:
+        """Historical releases per day, or None if fewer than two releases were seen"""
+        releases = sorted(self.get(key).get("releases", []))
+        if len(releases) < 2:
+            return None
+        span_days = max((releases[-1] - releases[0]) / 86400, 1.0)
+        return (len(releases) - 1) / span_days
+
+    def save(self):
+        write_json_atomic(self.path, {"repos": self.repos})
+
+
+class MetadataCache:
+    """
+    Repo metadata tier, refreshed far less often than release data.
+
+    Each repo key ("owner/repo", lowercase) maps to the manifest fields
+    taken from the repo info endpoint (name, description, repo, homepage,
+    license) plus "fetched", the epoch seconds of the fetch.
+    """
+
+    FIELDS = ("name", "description", "repo", "homepage", "license")
+
+    def __init__(self, path: str, ttl_days: float = METADATA_TTL_DAYS):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.repos: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.repos = json.load(f).get("repos", {})
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the cached metadata of key if it is younger than the TTL"""
+        entry = self.repos.get(key)
+        if not entry:
+            return None
+        now = now if now is not None else time.time()
+        if now - entry["fetched"] >= self.ttl:
+            return None
+        return {field: entry.get(field) for field in self.FIELDS}
+
+    def put(self, key: str, metadata: Dict[str, Any], now: Optional[float] = None):
+        entry = {field: metadata.get(field) for field in self.FIELDS}
+        entry["fetched"] = now if now is not None else time.time()
+        self.repos[key] = entry
+
+    def discard(self, key: str):
+        self.repos.pop(key, None)
+
+    def save(self):
+        write_json_atomic(self.path, {"repos": self.repos})
+
+
+class ReleasePageCache:
+    """
+    Releases listing pages with their ETags, for conditional requests.
+
+    One file per page URL under root; releases are slimmed to the fields the
+    generator uses. Pages are written from worker threads, each to its own
+    file.
+    """
+
+    RELEASE_FIELDS = ("tag_name", "name", "draft", "prerelease", "published_at")
+    ASSET_FIELDS = ("name", "size", "browser_download_url")
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @classmethod
+    def slim(cls, release: Dict[str, Any]) -> Dict[str, Any]:
+        slim = {field: release.get(field) for field in cls.RELEASE_FIELDS}
+        slim["assets"] = [
+            {field: asset.get(field) for field in cls.ASSET_FIELDS}
+            for asset in release.get("assets", [])
+        ]
+        return slim
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        path = self._path(url)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, page: Dict[str, Any]):
+        write_json_atomic(self._path(url), page)
+
+
+class NegativeCache:
+    """
+    Sources that produced no manifest entry, persisted between runs.
+
+    Each source line maps to:
+        reason  - why it produced nothing (a TTLS key)
+        checked - epoch seconds of the fetch that produced nothing
+        tag     - newest release feed tag at that time (release reasons only,
+                  absent until the feed has been read once)
+        updated - feed <updated> of that release (no_assets only): assets
+                  uploaded later under the same tag change it
+        listed  - no_releases found by listing releases (--history-depth)
+                  rather than by /releases/latest
+
+    Entries expire after the TTL of their reason and are dropped when their
+    source line is edited or removed from the sources files.
+    """
+
+    DAY = 86400
+    TTLS: Dict[str, float] = {
+        "invalid_url": 30 * DAY,
+        "not_found": 1 * DAY,
+        "no_releases": 3 * DAY,
+        "no_assets": 7 * DAY,
+        "no_scripts": 7 * DAY,
+    }
+    # Reasons a new release can resolve
+    RELEASE_REASONS = ("no_releases", "no_assets")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.sources = json.load(f).get("sources", {})
+
+    def record(
+        self,
+        source: str,
+        reason: str,
+        details: Optional[Dict[str, Any]] = None,
+        now: Optional[float] = None,
+    ):
+        entry = {"reason": reason, "checked": now if now is not None else time.time()}
+        entry.update(details or {})
+        self.sources[source] = entry
+
+    def clear(self, source: str):
+        self.sources.pop(source, None)
+
+    def lookup(self, source: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the entry of source if it has not expired"""
+        entry = self.sources.get(source)
+        if not entry:
+            return None
+        now = now if now is not None else time.time()
+        if now - entry["checked"] >= self.TTLS.get(entry["reason"], 0):
+            del self.sources[source]
+            return None
+        return entry
+
+    def prune(self, sources: List[str]):
+        """Drop entries whose source line is no longer listed"""
+        listed = set(sources)
+        for source in [s for s in self.sources if s not in listed]:
+            del self.sources[source]
+
+    def save(self):
+        write_json_atomic(self.path, {"sources": self.sources})
+
+
+class ScriptStore:
+    """
+    Local content store for scripts behind immutable URLs.
+
+    Gist raw URLs embed the revision hash (and raw.githubusercontent.com URLs
+    may embed a commit hash), so their content never changes. Each one is
+    fetched once; its bytes, sha256 and size are kept under the cache dir:
+        index.json           - url -> {sha256, size}
+        objects/<sha256>     - script bytes
+    """
+
+    IMMUTABLE_URL_PATTERNS = [
+        r"gist\.githubusercontent\.com/[^/]+/[a-f0-9]+/raw/[a-f0-9]{40}/",
+        r"raw\.githubusercontent\.com/[^/]+/[^/]+/[a-f0-9]{40}/",
+    ]
+
+    def __init__(self, root: str, opener=urlopen):
+        self.root = root
+        self.opener = opener
+        self.index_file = os.path.join(root, "index.json")
+        self.index: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    @classmethod
+    def is_immutable_url(cls, url: str) -> bool:
+        return any(re.search(pattern, url) for pattern in cls.IMMUTABLE_URL_PATTERNS)
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.root, "objects", sha256)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return {sha256, size} for a stored url whose object is intact"""
+        entry = self.index.get(url)
+        if entry and os.path.exists(self._object_path(entry["sha256"])):
+            return entry
+        return None
+
+    def put(self, url: str, content: bytes) -> Dict[str, Any]:
+        """Store content for url and return {sha256, size}"""
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self._object_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        entry = {"sha256": sha256, "size": len(content)}
+        self.index[url] = entry
+        return entry
+
+    def fingerprint(self, url: str, content: Optional[bytes] = None) -> Dict[str, Any]:
+        """
+        Return {sha256, size} for an immutable url, fetching it only if unseen.
+        content may be supplied when already known (e.g. inline gist content).
+        """
+        entry = self.get(url)
+        if entry:
+            return entry
+
+        if content is None:
+            req = Request(url, headers={"User-Agent": "Wenget-Bucket-Generator/1.0"})
+            with self.opener(req, timeout=30) as response:
+                content = response.read()
+        return self.put(url, content)
+
+    def save(self):
+        write_json_atomic(self.index_file, self.index)
+
+
+class ReleaseFeedChecker:
+    """
+    Detect new releases through releases.atom feeds.
+
+    Feeds are served by github.com rather than the REST API, so they do not
+    count against the API quota. Requests are conditional (ETag /
+    Last-Modified) and only the first <entry> of each feed is parsed.
+    """
+
+    ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+    def __init__(self, state: RefreshState, base_url: Optional[str] = None):
+        self.state = state
+        self.base_url = (base_url or GITHUB_WEB_BASE).rstrip("/")
+
+    def parse_newest_entry(self, stream) -> Optional[Tuple[str, Optional[str]]]:
+        """Stream-parse an Atom feed and return (tag, updated) of its first entry"""
+        in_entry = False
+        tag = updated = None
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if elem.tag == f"{self.ATOM_NS}entry":
+                if event == "start":
+                    in_entry = True
+                    continue
+                # End of the first entry; without a tag link nothing is usable
+                return (tag, updated) if tag else None
+            if event != "end" or not in_entry:
+                continue
+            if elem.tag == f"{self.ATOM_NS}link" and "/releases/tag/" in elem.get("href", ""):
+                tag = unquote(elem.get("href").rsplit("/releases/tag/", 1)[1])
+            elif elem.tag == f"{self.ATOM_NS}updated":
+                updated = (elem.text or "").strip() or None
+        return None
+
+    def parse_newest_tag(self, stream) -> Optional[str]:
+        """Stream-parse an Atom feed and return the tag of its first entry"""
+        newest = self.parse_newest_entry(stream)
+        return newest[0] if newest else None
+
+    def fetch_newest_tag(self, key: str) -> Optional[str]:
+        """Return the newest release tag of repo key, updating feed validators"""
+        entry = self.state.get(key)
+        headers = {"User-Agent": "Wenget-Bucket-Generator/1.0"}
+        if entry.get("feed_etag"):
+            headers["If-None-Match"] = entry["feed_etag"]
+        if entry.get("feed_modified"):
+            headers["If-Modified-Since"] = entry["feed_modified"]
+
+        req = Request(f"{self.base_url}/{key}/releases.atom", headers=headers)
+        try:
+            with urlopen(req, timeout=30) as response:
+                tag, feed_updated = self.parse_newest_entry(response) or (None, None)
+                validators = {
+                    "feed_etag": response.headers.get("ETag"),
+                    "feed_modified": response.headers.get("Last-Modified"),
+                }
+        except HTTPError as e:
+            if e.code == 304:
+                return entry.get("feed_latest")
+            raise
+
+        updated = self.state.repos.setdefault(key, {})
+        updated.update({k: v for k, v in validators.items() if v})
+        updated["feed_latest"] = tag
+        updated["feed_updated"] = feed_updated
+        return tag
+
+    def newest_tags(self, keys: List[str]) -> Dict[str, Optional[str]]:
+        """Check feeds concurrently; keys whose check failed are left out"""
+        failed = object()
+
+        def check(key: str):
+            try:
+                return self.fetch_newest_tag(key)
+            except (HTTPError, URLError, OSError, ET.ParseError) as e:
+                print(f"   ⚠️  Feed check failed for {key}: {e}")
+                return failed
+
+        with ThreadPoolExecutor(max_workers=FEED_WORKERS) as executor:
+            tags = dict(zip(keys, executor.map(check, keys)))
+
+        return {key: tag for key, tag in tags.items() if tag is not failed}
+
+    def find_unchanged(
+        self, keys: List[str], known_tags: Optional[Dict[str, str]] = None
+    ) -> List[str]:
+        """
+        Return keys whose newest feed tag matches the one seen at their last
+        fetch. Keys fetched before feeds were ever checked have no feed tag
+        yet and are compared with known_tags (e.g. the previous manifest's
+        release tags) instead.
+        """
+        tags = self.newest_tags(keys)
+        known_tags = known_tags or {}
+        return [
+            key for key in keys
+            if tags.get(key) is not None
+            and tags[key] == self.state.get(key).get("feed_tag", known_tags.get(key))
+        ]
+
+
+class RefreshScheduler:
+    """
+    Choose which repos to refresh under a fixed request budget.
+
+    Priority = days since last successful check x (historical release rate +
+    baseline rate). Never-checked repos come first; the baseline rate keeps
+    rarely releasing repos from starving forever.
+    """
+
+    BASELINE_RELEASE_RATE = 1 / 90  # releases per day assumed for every repo
+
+    def __init__(self, state: RefreshState, now: Optional[float] = None):
+        self.state = state
+        self.now = now if now is not None else time.time()
+
+    def priority(self, key: str) -> float:
+        last_success = self.state.get(key).get("last_success")
+        if last_success is None:
+            return float("inf")
+        staleness_days = max(self.now - last_success, 0) / 86400
+        rate = self.state.release_rate(key) or 0.0
+        return staleness_days * (rate + self.BASELINE_RELEASE_RATE)
+
+    def plan(self, keys: List[str], budget: int, cost=None) -> List[str]:
+        """
+        Return the keys to refresh, highest priority first.
+
+        cost(key) gives the API requests a refresh of key needs (default
+        REQUESTS_PER_REPO); keys are taken in priority order while they fit.
+        """
+        cost = cost or (lambda key: REQUESTS_PER_REPO)
+        # Stable sort: ties keep sources file order
+        ranked = sorted(keys, key=self.priority, reverse=True)
+        planned = []
+        remaining = max(budget, 0)
+        for key in ranked:
+            needed = cost(key)
+            if needed > remaining:
+                continue  # a cheaper, lower-priority key may still fit
+            planned.append(key)
+            remaining -= needed
+        return planned
+
 
 class ManifestGenerator:
     """Generate manifest.json from sources.txt"""
 
-    def __init__(self, github_token: Optional[str] = None):
-        self.api = GitHubAPI(github_token)
+    def __init__(
+        self,
+        github_token: Optional[Any] = None,
+        explain: bool = False,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        introspect: bool = False,
+        history_db: Optional[str] = None,
+        use_negative_cache: bool = True,
+        metadata_ttl: float = METADATA_TTL_DAYS,
+        refresh_metadata: bool = False,
+        history_depth: int = 0,
+    ):
+        # A single token or a list of tokens (pool)
+        if isinstance(github_token, list):
+            self.api = GitHubAPI(tokens=github_token)
+        else:
+            self.api = GitHubAPI(github_token)
+        self.history = HistoryStore(history_db) if history_db else None
+        self.history_run: Optional[int] = None
+        self.explain = explain
+        self.introspect = introspect
+        self.inspector = ArchiveInspector()
+        self.inspections_file = os.path.join(cache_dir, "introspection.json")
+        self.inspections: Dict[str, List[Dict[str, str]]] = {}
+        if introspect and os.path.exists(self.inspections_file):
+            with open(self.inspections_file, "r", encoding="utf-8") as f:
+                self.inspections = json.load(f)
+        self.state = RefreshState(os.path.join(cache_dir, "refresh_state.json"))
+        self.negative = NegativeCache(os.path.join(cache_dir, "negative_cache.json"))
+        self.metadata = MetadataCache(os.path.join(cache_dir, "repo_metadata.json"), metadata_ttl)
+        self.refresh_metadata = refresh_metadata
+        self.metadata_hits = 0
+        self.history_depth = history_depth
+        self.release_pages = ReleasePageCache(os.path.join(cache_dir, "releases"))
+        self.versions: Dict[str, List[Dict[str, Any]]] = {}
+        self.use_negative_cache = use_negative_cache
+        self.snapshot_file = os.path.join(cache_dir, "sources_snapshot.json")
+        self.script_store = ScriptStore(
+            os.path.join(cache_dir, "scripts"), opener=self.api.breaker.urlopen
+        )
         self.packages = []
         self.scripts = []
+        self.coverage = CoverageIndex([], {})
+
+    def repo_key(self, url: str) -> Optional[str]:
+        """Normalized "owner/repo" key for a GitHub URL"""
+        parsed = self.parse_github_url(url)
+        if not parsed:
+            return None
+        return f"{parsed[0]}/{parsed[1]}".lower()
+
+    def script_source_key(self, url: str) -> str:
+        """Key linking a scripts source URL to the script entries it produced"""
+        if self.is_raw_script_url(url):
+            return url
+        return self.parse_gist_url(url) or url
+
+    def script_entry_key(self, script: Dict[str, Any]) -> str:
+        """script_source_key() of the source a manifest script entry came from"""
+        if "url" in script:
+            return self.script_source_key(script["url"])
+        # Per-platform entries carry no single URL; their repo is the gist page
+        return self.script_source_key(script.get("repo", ""))
+
+    def _read_previous_manifest(self, manifest_file: str) -> Dict[str, Any]:
+        if not os.path.exists(manifest_file):
+            return {}
+
+        try:
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                manifest_obj = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Cannot read previous manifest {manifest_file}: {e}")
+            return {}
+
+        if isinstance(manifest_obj, list):
+            return {"packages": manifest_obj}
+        return manifest_obj
+
+    def load_previous_packages(self, manifest_file: str) -> Dict[str, Dict[str, Any]]:
+        """Load packages of an existing manifest keyed by repo key"""
+        previous = {}
+        for package in self._read_previous_manifest(manifest_file).get("packages", []):
+            key = self.repo_key(package.get("repo", ""))
+            if key:
+                previous[key] = package
+        return previous
+
+    @staticmethod
+    def package_tag(package: Dict[str, Any]) -> Optional[str]:
+        """Release tag of a manifest package, read from its release asset URLs"""
+        for info in package.get("platforms", {}).values():
+            match = re.search(r"/releases/download/([^/]+)/", info.get("url", ""))
+            if match:
+                return unquote(match.group(1))
+        return None
+
+    def load_previous_scripts(self, manifest_file: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Load scripts of an existing manifest grouped by script_source_key()"""
+        previous: Dict[str, List[Dict[str, Any]]] = {}
+        for script in self._read_previous_manifest(manifest_file).get("scripts", []):
+            previous.setdefault(self.script_entry_key(script), []).append(script)
+        return previous
+
+    def save_sources_snapshot(
+        self, repo_urls: List[str], script_urls: List[str], unresolved: Collection[str] = ()
+    ):
+        """
+        Remember the sources a manifest was generated from. Sources in
+        unresolved (fetch failed or returned nothing) are left out, so the
+        next changed-only run sees them as added and fetches them again.
+        """
+        write_json_atomic(self.snapshot_file, {
+            "repos": [url for url in repo_urls if url not in unresolved],
+            "scripts": [url for url in script_urls if url not in unresolved],
+        })
+
+    def cached_metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached repo metadata of key, or None if it must be fetched"""
+        if self.refresh_metadata:
+            return None
+        return self.metadata.get(key)
+
+    def refresh_cost(self, key: str) -> int:
+        """API requests a refresh of repo key needs"""
+        release_requests = 1  # latest release, or the first listing page
+        if self.history_depth:
+            release_requests = max(-(-self.history_depth // RELEASES_PER_PAGE), 1)
+        if self.cached_metadata(key) is not None:
+            return release_requests
+        return release_requests + 1
+
+    def record_negative(self, url: str, reason: str):
+        """Negatively cache a source, with its feed tag for release reasons"""
+        details: Dict[str, Any] = {}
+        key = self.repo_key(url)
+        feed = self.state.get(key) if key else {}
+        if reason in NegativeCache.RELEASE_REASONS and "feed_latest" in feed:
+            details["tag"] = feed["feed_latest"]
+            if reason == "no_assets" and feed.get("feed_updated"):
+                details["updated"] = feed["feed_updated"]
+        if reason == "no_releases" and self.history_depth:
+            details["listed"] = True
+        self.negative.record(url, reason, details)
+
+    def negative_sources(self, urls: List[str], check_releases: bool = False) -> Dict[str, str]:
+        """
+        Return {url: reason} for urls with a valid negative cache entry.
+
+        With check_releases, entries whose reason a new release can resolve
+        are checked against the release feeds (no API quota) and dropped if
+        the newest tag changed since they were recorded.
+        """
+        if not self.use_negative_cache:
+            return {}
+        cached = {url: self.negative.lookup(url) for url in urls}
+        cached = {
+            url: entry for url, entry in cached.items()
+            # /releases/latest ignores prereleases; listing releases may find some
+            if entry and not (
+                self.history_depth and entry["reason"] == "no_releases" and not entry.get("listed")
+            )
+        }
+
+        if check_releases:
+            keys = {
+                url: self.repo_key(url) for url, entry in cached.items()
+                if entry["reason"] in NegativeCache.RELEASE_REASONS and self.repo_key(url)
+            }
+            tags = ReleaseFeedChecker(self.state).newest_tags(sorted(set(keys.values())))
+            for url, key in keys.items():
+                if key not in tags:
+                    continue
+                entry = cached[url]
+                updated = self.state.get(key).get("feed_updated")
+                if "tag" not in entry:
+                    # First feed read since the entry was recorded: baseline
+                    entry["tag"] = tags[key]
+                elif tags[key] != entry["tag"]:
+                    print(f"   🔔 New release {tags[key]} for {key}, retrying")
+                    self.negative.clear(url)
+                    del cached[url]
+                    continue
+                if entry["reason"] != "no_assets" or not updated:
+                    continue
+                if "updated" not in entry:
+                    entry["updated"] = updated
+                elif updated != entry["updated"]:
+                    print(f"   🔔 Release {tags[key]} of {key} was updated, retrying")
+                    self.negative.clear(url)
+                    del cached[url]
+
+        return {url: entry["reason"] for url, entry in cached.items()}
+
+    def generate_changed(
+        self,
+        sources_file: str,
+        sources_scripts_file: str,
+        output_file: str,
+        base_ref: Optional[str] = None,
+    ):
+        """
+        Patch an existing manifest for changed sources only.
+
+        Sources are compared with git ref base_ref, or with the snapshot saved
+        by the last run. Added URLs are fetched, entries of removed URLs are
+        dropped, and every other entry is left untouched.
+        """
+        print("🚀 Wenget Bucket Manifest Generator (changed sources only)")
+        print("=" * 50)
+
+        manifest_obj = self._read_previous_manifest(output_file)
+        if base_ref:
+            base_repos = self.load_sources_at_ref(sources_file, base_ref)
+            base_scripts = self.load_sources_at_ref(sources_scripts_file, base_ref)
+            print(f"ℹ️  Comparing sources with {base_ref}")
+        elif os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            base_repos, base_scripts = snapshot["repos"], snapshot["scripts"]
+            print(f"ℹ️  Comparing sources with snapshot {self.snapshot_file}")
+        else:
+            manifest_obj = {}
+
+        if not manifest_obj:
+            print("⚠️  No previous manifest or sources baseline, running full generation")
+            self.generate(sources_file, sources_scripts_file, output_file)
+            return
+
+        repo_urls = self.load_sources(sources_file)
+        script_urls = self.load_sources(sources_scripts_file)
+
+        current_repos = {self.repo_key(url) or url: url for url in repo_urls}
+        previous_repos = {self.repo_key(url) or url for url in base_repos}
+        added_repos = [url for key, url in current_repos.items() if key not in previous_repos]
+        removed_repos = previous_repos - set(current_repos)
+
+        current_scripts = {self.script_source_key(url): url for url in script_urls}
+        previous_scripts = {self.script_source_key(url) for url in base_scripts}
+        added_scripts = [url for key, url in current_scripts.items() if key not in previous_scripts]
+        removed_scripts = previous_scripts - set(current_scripts)
+
+        print(
+            f"📝 Repositories: +{len(added_repos)} -{len(removed_repos)}, "
+            f"scripts: +{len(added_scripts)} -{len(removed_scripts)}"
+        )
+
+        self.packages = [
+            pkg for pkg in manifest_obj.get("packages", [])
+            if (self.repo_key(pkg.get("repo", "")) or pkg.get("repo")) not in removed_repos
+        ]
+        self.scripts = [
+            script for script in manifest_obj.get("scripts", [])
+            if self.script_entry_key(script) not in removed_scripts
+        ]
+
+        unresolved = set()
+        if added_scripts:
+            print(f"\n📜 Fetching added scripts...")
+            fetched, _ = self.process_with_retries(added_scripts, self.fetch_scripts_from_url)
+            for url in added_scripts:
+                if fetched.get(url):
+                    self.scripts.extend(fetched[url])
+                else:
+                    unresolved.add(url)
+            self.script_store.save()
+
+        if added_repos:
+            print(f"\n📦 Fetching added packages...")
+            if self.history:
+                self.history_run = self.history.start_run()
+            fetched, _ = self.process_with_retries(added_repos, self.fetch_package_timed)
+            for url in added_repos:
+                if fetched.get(url):
+                    self.packages.append(fetched[url])
+                else:
+                    unresolved.add(url)
+            self.state.save()
+            self.metadata.save()
+            if self.introspect:
+                write_json_atomic(self.inspections_file, self.inspections)
+            if self.history:
+                self.history.finish_run(self.history_run)
+
+        self.negative.prune(repo_urls + script_urls)
+        self.negative.save()
+        self.save_manifest(output_file)
+        self.save_sources_snapshot(repo_urls, script_urls, unresolved)
+        if unresolved:
+            print(f"\n🔁 {len(unresolved)} added source(s) not resolved, retried next run")
+        self.print_summary(output_file, len(repo_urls))
+
+    def fetch_package_timed(self, url: str) -> Optional[Dict[str, Any]]:
+        """fetch_package_info, recording the fetch timing in the history store"""
+        started = time.time()
+        status = "error"
+        try:
+            package = self.fetch_package_info(url)
+            status = "ok" if package else "empty"
+        except TransientError:
+            status = "transient"
+            raise
+        finally:
+            if self.history:
+                self.history.record_timing(
+                    self.history_run, self.repo_key(url) or url, time.time() - started, status
+                )
+        if package:
+            print(f"   ✓ {package['name']} - {len(package['platforms'])} platforms")
+        return package
+
+    def process_with_retries(self, urls: List[str], fetch) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Run fetch(url) for every url through a deferred retry queue.
+
+        A source failing with TransientError goes to the back of the queue with
+        its own exponential backoff while other sources continue; the run only
+        sleeps when every remaining source is waiting. Returns (results for
+        sources that completed, sources that ran out of attempts).
+        """
+        # Heap of (ready_at, sequence, attempt, url); sequence keeps file order
+        queue = [(0.0, i, 0, url) for i, url in enumerate(urls)]
+        heapq.heapify(queue)
+        sequence = len(urls)
+        results: Dict[str, Any] = {}
+        exhausted: List[str] = []
+        done = 0
+
+        while queue:
+            ready_at, _, attempt, url = heapq.heappop(queue)
+            wait = ready_at - time.time()
+            if wait > 0:
+                print(f"\n⏳ Waiting {wait:.0f}s for deferred retries...")
+                time.sleep(wait)
+            elif done:
+                # Rate limiting
+                time.sleep(RATE_LIMIT_DELAY)
+
+            done += 1
+            retry_note = f" (attempt {attempt + 1}/{MAX_RETRIES})" if attempt else ""
+            print(f"\n[{done}] {url}{retry_note}")
+
+            try:
+                results[url] = fetch(url)
+            except TransientError as e:
+                if attempt + 1 < MAX_RETRIES:
+                    delay = RETRY_DELAY * (2 ** attempt)
+                    print(f"   ⏳ {e} - retrying in {delay}s")
+                    heapq.heappush(queue, (time.time() + delay, sequence, attempt + 1, url))
+                    sequence += 1
+                else:
+                    print(f"   ❌ {e} - giving up after {MAX_RETRIES} attempts")
+                    exhausted.append(url)
+
+            # Show rate limit status periodically
+            if done % 10 == 0:
+                self.api.check_rate_limit()
+
+        return results, exhausted
+
+    def resolve_budget(self, budget: Union[int, str]) -> int:
+        """Turn --budget (a number or "auto") into a request count"""
+        if budget != "auto":
+            return int(budget)
+        remaining, reset = self.api.get_core_quota()
+        resets_in = max(int(reset - time.time()), 0)
+        print(f"ℹ️  Quota: {remaining} remaining, resets in {resets_in}s")
+        return max(remaining - QUOTA_RESERVE, 0)
 
     def parse_github_url(self, url: str) -> Optional[tuple]:
         """Parse GitHub URL to extract owner and repo"""
@@ -464,7 +1659,7 @@ class ManifestGenerator:
                         "User-Agent": "Wenget-Bucket-Generator/1.0",
                     }
                     req = Request(url, headers=headers)
-                    with urlopen(req, timeout=30) as response:
+                    with self.api.breaker.urlopen(req, timeout=30) as response:
                         # Only read first 1KB to check shebang
                         content = response.read(1024).decode('utf-8', errors='ignore')
                         script_type = self.detect_script_type_from_shebang(content)
@@ -473,7 +1668,15 @@ class ManifestGenerator:
                         print(f"   ✓ Detected {script_type} from shebang")
                     else:
                         print(f"   ⚠️  Cannot detect script type from shebang")
+                        self.record_negative(url, "no_scripts")
                         return []
+                except TransientError:
+                    raise
+                except HTTPError as e:
+                    print(f"   ⚠️  Failed to fetch content for shebang detection: {e}")
+                    if e.code == 404:
+                        self.record_negative(url, "not_found")
+                    return []
                 except Exception as e:
                     print(f"   ⚠️  Failed to fetch content for shebang detection: {e}")
                     return []
@@ -502,8 +1705,17 @@ class ManifestGenerator:
                 "repo": repo_url or url,
             }
 
+            if ScriptStore.is_immutable_url(url):
+                try:
+                    script.update(self.script_store.fingerprint(url))
+                except (TransientError, HTTPError, URLError, OSError) as e:
+                    print(f"   ⚠️  Cannot fingerprint {filename}: {e}")
+
+            self.negative.clear(url)
             return [script]
 
+        except TransientError:
+            raise
         except Exception as e:
             print(f"❌ Error processing raw script {url}: {e}")
             return []
@@ -513,6 +1725,7 @@ class ManifestGenerator:
         gist_id = self.parse_gist_url(url)
         if not gist_id:
             print(f"⚠️  Invalid Gist URL: {url}")
+            self.record_negative(url, "invalid_url")
             return []
 
         try:
@@ -527,7 +1740,7 @@ class ManifestGenerator:
             }
             req = Request(gist_url, headers=headers)
 
-            with urlopen(req, timeout=30) as response:
+            with self.api.breaker.urlopen(req, timeout=30) as response:
                 gist_data = json.loads(response.read().decode("utf-8"))
 
             scripts = []
@@ -554,10 +1767,33 @@ class ManifestGenerator:
                     "repo": gist_data["html_url"],
                 }
 
+                # Revision URLs are immutable: hash each revision only once
+                if ScriptStore.is_immutable_url(script["url"]):
+                    inline = file_info.get("content")
+                    if inline is not None and not file_info.get("truncated"):
+                        inline = inline.encode("utf-8")
+                    else:
+                        inline = None
+                    try:
+                        script.update(self.script_store.fingerprint(script["url"], inline))
+                    except (TransientError, HTTPError, URLError, OSError) as e:
+                        print(f"   ⚠️  Cannot fingerprint {filename}: {e}")
+
                 scripts.append(script)
 
+            if scripts:
+                self.negative.clear(url)
+            else:
+                self.record_negative(url, "no_scripts")
             return scripts
 
+        except TransientError:
+            raise
+        except HTTPError as e:
+            print(f"❌ Error fetching gist {gist_id}: {e}")
+            if e.code == 404:
+                self.record_negative(url, "not_found")
+            return []
         except Exception as e:
             print(f"❌ Error fetching gist {gist_id}: {e}")
             return []
@@ -571,141 +1807,398 @@ class ManifestGenerator:
         else:
             return self.fetch_gist_scripts(url)
 
+    def select_platform_assets(
+        self, assets: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Pick the best asset per platform key.
+
+        Returns the platforms mapping for the manifest and a report explaining
+        each choice (chosen asset and every rejected candidate with its score).
+        """
+        candidates: Dict[str, List[Tuple[Tuple[int, int], Dict[str, Any]]]] = {}
+        for asset in assets:
+            platform = PlatformDetector.detect_platform(asset["name"])
+            if platform:
+                score = PlatformDetector.score_asset(asset["name"], platform)
+                candidates.setdefault(platform, []).append((score, asset))
+
+        platforms = {}
+        report = []
+        for platform in sorted(candidates):
+            # Stable sort keeps release order between identical scores
+            ranked = sorted(candidates[platform], key=lambda c: c[0], reverse=True)
+            score, best = ranked[0]
+            # Smallest archive format of the chosen build (min keeps release order on ties)
+            build = PlatformDetector.build_name(best["name"])
+            best = min(
+                (asset for other_score, asset in ranked
+                 if other_score == score and PlatformDetector.build_name(asset["name"]) == build),
+                key=lambda asset: asset["size"],
+            )
+            platforms[platform] = {
+                "url": best["browser_download_url"],
+                "size": best["size"],
+            }
+            describe = PlatformDetector.describe_score
+            report.append(
+                f"{platform}: {best['name']} [{describe(best['name'], score, best['size'])}]"
+            )
+            for other_score, other in ranked:
+                if other is not best:
+                    report.append(
+                        f"   rejected {other['name']} "
+                        f"[{describe(other['name'], other_score, other['size'])}]"
+                    )
+
+        return platforms, report
+
+    def add_binaries(self, platforms: Dict[str, Dict[str, Any]]):
+        """
+        Record the executables inside each selected asset as "binaries".
+
+        Release asset URLs are immutable, so results are cached by URL and
+        each archive is inspected only once.
+        """
+        def inspect(info: Dict[str, Any]) -> Optional[List[Dict[str, str]]]:
+            url = info["url"]
+            if url in self.inspections:
+                return self.inspections[url]
+            try:
+                return self.inspector.inspect(url, info["size"])
+            except Exception as e:
+                print(f"   ⚠️  Cannot inspect {url}: {e}")
+                return None
+
+        entries = list(platforms.values())
+        with ThreadPoolExecutor(max_workers=FEED_WORKERS) as executor:
+            results = list(executor.map(inspect, entries))
+
+        for info, binaries in zip(entries, results):
+            if binaries is not None:
+                self.inspections[info["url"]] = binaries
+                info["binaries"] = binaries
+
+    def fetch_release_history(self, owner: str, repo: str, name: str) -> Dict[str, Any]:
+        """
+        List the newest history_depth releases, record the versions that have
+        platform assets under name and return the release to use as latest:
+        the newest stable release with assets, else the newest prerelease
+        with assets, else the newest release.
+        """
+        releases = [
+            release
+            for release in self.api.list_releases(
+                owner, repo, self.history_depth, self.release_pages
+            )
+            if not release.get("draft")
+        ]
+        if not releases:
+            raise NoReleasesError(f"No releases: {owner}/{repo}")
+
+        versions = []
+        for release in releases:
+            platforms, _ = self.select_platform_assets(release.get("assets", []))
+            if platforms:
+                versions.append({
+                    "version": release["tag_name"],
+                    "published_at": release.get("published_at"),
+                    "prerelease": bool(release.get("prerelease")),
+                    "platforms": platforms,
+                })
+        self.versions[name] = versions
+
+        with_assets = {version["version"] for version in versions}
+        for release in releases:
+            if release["tag_name"] in with_assets and not release.get("prerelease"):
+                return release
+        for release in releases:
+            if release["tag_name"] in with_assets:
+                print(f"   ℹ️  Using prerelease {release['tag_name']} (no stable release with assets)")
+                return release
+        return releases[0]
+
     def fetch_package_info(self, url: str) -> Optional[Dict[str, Any]]:
         """Fetch package information from GitHub"""
         parsed = self.parse_github_url(url)
         if not parsed:
             print(f"⚠️  Invalid GitHub URL: {url}")
+            self.record_negative(url, "invalid_url")
             return None
 
         owner, repo = parsed
+        key = f"{owner}/{repo}".lower()
 
         try:
-            # Get repository info
-            repo_info = self.api.get_repo_info(owner, repo)
+            # Repository metadata tier: reused until its TTL expires
+            metadata = self.cached_metadata(key)
+            if metadata is None:
+                repo_info = self.api.get_repo_info(owner, repo)
+                metadata = {
+                    "name": repo_info["name"],
+                    "description": repo_info["description"] or "",
+                    "repo": repo_info["html_url"],
+                    "homepage": repo_info["homepage"],
+                    "license": repo_info["license"]["spdx_id"]
+                    if repo_info.get("license")
+                    else None,
+                }
+                self.metadata.put(key, metadata)
+            else:
+                self.metadata_hits += 1
 
-            # Get latest release
+            # Release tier: fetched on every refresh
             try:
-                release = self.api.get_latest_release(owner, repo)
+                if self.history_depth:
+                    release = self.fetch_release_history(owner, repo, metadata["name"])
+                else:
+                    release = self.api.get_latest_release(owner, repo)
+            except TransientError:
+                raise
             except Exception as e:
                 print(f"⚠️  No releases found for {owner}/{repo}: {e}")
+                if isinstance(e, NotFoundError):
+                    # The repo itself may be gone; re-read its metadata next time
+                    self.metadata.discard(key)
+                if isinstance(e, (NotFoundError, NoReleasesError)):
+                    self.record_negative(url, "no_releases")
                 return None
+            self.state.record_success(key, release)
 
             # Extract platform binaries from assets
-            # Track platform info with priority for compiler variants
-            platforms = {}
-            platform_priorities = {}  # Track priority of selected assets
-
-            for asset in release.get("assets", []):
-                platform = PlatformDetector.detect_platform(asset["name"])
-                if platform:
-                    asset_info = {
-                        "url": asset["browser_download_url"],
-                        "size": asset["size"],
-                    }
-
-                    # Get priority for this asset (supports all platforms)
-                    # Linux: musl > gnu, Windows: msvc > gnu > musl
-                    current_priority = PlatformDetector.get_asset_priority(asset["name"], platform)
-                    existing_priority = platform_priorities.get(platform, 0)
-
-                    # Only update if current asset has higher priority
-                    if current_priority > existing_priority:
-                        platforms[platform] = asset_info
-                        platform_priorities[platform] = current_priority
+            platforms, report = self.select_platform_assets(release.get("assets", []))
+            if self.explain:
+                for line in report:
+                    print(f"   {line}")
 
             if not platforms:
                 print(f"⚠️  No binary assets found for {owner}/{repo}")
+                if self.history:
+                    # Still an observed release: recorded without selections
+                    self.history.record_package(
+                        self.history_run, key, release, dict(metadata, platforms={})
+                    )
+                self.record_negative(url, "no_assets")
                 return None
 
+            if self.introspect:
+                self.add_binaries(platforms)
+
             # Build package info
-            package = {
-                "name": repo_info["name"],
-                "description": repo_info["description"] or "",
-                "repo": repo_info["html_url"],
-                "homepage": repo_info["homepage"],
-                "license": repo_info["license"]["spdx_id"]
-                if repo_info.get("license")
-                else None,
-                "platforms": platforms,
-            }
+            package = dict(metadata)
+            package["platforms"] = platforms
+
+            if self.history:
+                self.history.record_package(self.history_run, key, release, package)
 
+            self.negative.clear(url)
             return package
 
+        except TransientError:
+            raise
+        except NotFoundError as e:
+            print(f"❌ Error fetching {owner}/{repo}: {e}")
+            self.metadata.discard(key)
+            self.record_negative(url, "not_found")
+            return None
         except Exception as e:
             print(f"❌ Error fetching {owner}/{repo}: {e}")
             return None
 
-    def load_sources(self, sources_file: str) -> List[str]:
-        """Load GitHub URLs from sources file"""
+    def parse_sources(self, text: str) -> List[str]:
+        """Parse sources file content into URLs"""
         urls = []
+        for line in text.splitlines():
+            line = line.strip()
+            # Skip empty lines and comments
+            if line and not line.startswith("#"):
+                urls.append(line)
+        return urls
 
+    def load_sources(self, sources_file: str) -> List[str]:
+        """Load GitHub URLs from sources file"""
         if not sources_file or not os.path.exists(sources_file):
-            return urls
+            return []
 
         with open(sources_file, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                # Skip empty lines and comments
-                if line and not line.startswith("#"):
-                    urls.append(line)
-
-        return urls
-
-    def generate(self, sources_file: str, sources_scripts_file: str, output_file: str):
+            return self.parse_sources(f.read())
+
+    def load_sources_at_ref(self, sources_file: str, ref: str) -> List[str]:
+        """Load a sources file as it was at git ref (empty if it did not exist)"""
+        directory = os.path.dirname(os.path.abspath(sources_file))
+        result = subprocess.run(
+            ["git", "show", f"{ref}:./{os.path.basename(sources_file)}"],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+        )
+        if result.returncode != 0:
+            if "exists on disk, but not in" in result.stderr or "does not exist in" in result.stderr:
+                return []
+            raise ValueError(f"git show failed: {result.stderr.strip()}")
+        return self.parse_sources(result.stdout)
+
+    def generate(
+        self,
+        sources_file: str,
+        sources_scripts_file: str,
+        output_file: str,
+        budget: Optional[Union[int, str]] = None,
+        check_feeds: bool = False,
+    ):
         """Generate manifest.json from sources files"""
         print("🚀 Wenget Bucket Manifest Generator")
         print("=" * 50)
 
+        if self.history:
+            self.history_run = self.history.start_run()
+
+        # Sources attempted without result, left out of the sources snapshot
+        unresolved = set()
+
         # Load script sources FIRST (to avoid rate limit issues)
         print(f"\n📖 Loading script sources from {sources_scripts_file}...")
         gist_urls = self.load_sources(sources_scripts_file)
         print(f"✓ Found {len(gist_urls)} gists")
 
+        negative_scripts = self.negative_sources(gist_urls)
+        script_fetch_urls = [url for url in gist_urls if url not in negative_scripts]
+        self.print_negative(negative_scripts)
+
         # Fetch script info FIRST
-        if gist_urls:
+        if script_fetch_urls:
             print(f"\n📜 Fetching script information...")
-            for i, url in enumerate(gist_urls, 1):
-                print(f"\n[{i}/{len(gist_urls)}] {url}")
 
+            def fetch_scripts(url: str) -> List[Dict[str, Any]]:
                 scripts = self.fetch_scripts_from_url(url)
-                if scripts:
-                    self.scripts.extend(scripts)
-                    for script in scripts:
-                        print(f"   ✓ {script['name']} ({script['script_type']})")
-
-                # Rate limiting
-                if i < len(gist_urls):
-                    time.sleep(RATE_LIMIT_DELAY)
+                for script in scripts:
+                    print(f"   ✓ {script['name']} ({script['script_type']})")
+                return scripts
+
+            fetched_scripts, failed = self.process_with_retries(script_fetch_urls, fetch_scripts)
+            previous_scripts = self.load_previous_scripts(output_file) if failed else {}
+            for url in script_fetch_urls:
+                if url in fetched_scripts:
+                    scripts = fetched_scripts[url]
+                else:
+                    # Fall back to the previous manifest's entries
+                    scripts = previous_scripts.get(self.script_source_key(url), [])
+                    if scripts:
+                        print(f"   ♻️  Reusing {len(scripts)} previous script(s) for {url}")
+                if not scripts:
+                    unresolved.add(url)
+                self.scripts.extend(scripts)
 
-                # Show rate limit status periodically
-                if i % 10 == 0:
-                    self.api.check_rate_limit()
+        self.script_store.save()
 
         # Load package sources AFTER scripts
         print(f"\n📖 Loading package sources from {sources_file}...")
         urls = self.load_sources(sources_file)
         print(f"✓ Found {len(urls)} repositories")
 
+        # Decide which repos to refresh
+        keys = {url: self.repo_key(url) or url for url in urls}
+        negative_repos = self.negative_sources(urls, check_releases=True)
+        self.print_negative(negative_repos)
+        refresh_urls = [url for url in urls if url not in negative_repos]
+        previous = self.load_previous_packages(output_file)
+
+        if check_feeds:
+            # Every feed is checked so its tag is known when the repo is fetched,
+            # but only repos present in the previous manifest can be carried over
+            feed_keys = [keys[url] for url in refresh_urls if self.repo_key(url)]
+            print(f"\n📡 Checking {len(feed_keys)} release feeds...")
+            checker = ReleaseFeedChecker(self.state)
+            known_tags = {
+                key: self.package_tag(package) or self.state.get(key).get("tag")
+                for key, package in previous.items()
+            }
+            unchanged = set(checker.find_unchanged(feed_keys, known_tags)) & set(previous)
+            for key in unchanged:
+                self.state.record_unchanged(key)
+            refresh_urls = [url for url in refresh_urls if keys[url] not in unchanged]
+            print(f"✓ {len(unchanged)} unchanged, {len(refresh_urls)} to refresh")
+
+        if budget is not None:
+            request_budget = self.resolve_budget(budget)
+            planned = RefreshScheduler(self.state).plan(
+                [keys[url] for url in refresh_urls], request_budget, cost=self.refresh_cost
+            )
+            order = {key: i for i, key in enumerate(planned)}
+            refresh_urls = sorted(
+                (url for url in refresh_urls if keys[url] in order),
+                key=lambda url: order[keys[url]],
+            )
+            print(
+                f"📅 Budget {request_budget} requests: refreshing {len(refresh_urls)}"
+                f"/{len(urls)} repositories (most stale first)"
+            )
+
         # Fetch package info
         print(f"\n📦 Fetching package information...")
-        for i, url in enumerate(urls, 1):
-            print(f"\n[{i}/{len(urls)}] {url}")
 
-            package = self.fetch_package_info(url)
+        fetched, failed = self.process_with_retries(refresh_urls, self.fetch_package_timed)
+
+        # Assemble in sources order, carrying over the previous entry of every
+        # source that is not negatively cached yet produced no package (not
+        # planned, refresh kept failing, or came back without a result)
+        skipped = {
+            url for url in urls
+            if url not in negative_repos and not self.negative.lookup(url)
+        }
+        carried = 0
+        for url in urls:
+            package = fetched.get(url)
+            if not package and url in skipped:
+                package = previous.get(keys[url])
+                if not package and self.history:
+                    # Not in the previous manifest, but known from the history store
+                    package = self.history.latest_package(keys[url])
+                if package:
+                    carried += 1
             if package:
                 self.packages.append(package)
-                print(f"   ✓ {package['name']} - {len(package['platforms'])} platforms")
-
-            # Rate limiting
-            if i < len(urls):
-                time.sleep(RATE_LIMIT_DELAY)
-
-            # Show rate limit status periodically
-            if i % 10 == 0:
-                self.api.check_rate_limit()
-
-        # Save manifest
+            elif url in refresh_urls:
+                unresolved.add(url)
+        if failed:
+            print(f"\n⚠️  {len(failed)} repositories kept failing")
+        if carried:
+            print(f"\n♻️  Carried over {carried} packages from previous manifest")
+
+        self.state.save()
+        self.metadata.save()
+        self.negative.prune(urls + gist_urls)
+        self.negative.save()
+        if self.metadata_hits:
+            print(f"\nℹ️  Reused cached metadata for {self.metadata_hits} repositories")
+        if self.introspect:
+            write_json_atomic(self.inspections_file, self.inspections)
+        if self.history:
+            self.history.finish_run(self.history_run)
+
+        self.save_manifest(output_file)
+        self.save_sources_snapshot(urls, gist_urls, unresolved)
+        self.print_summary(output_file, len(urls))
+
+    def close(self):
+        """Release resources held between runs (the history store connection)"""
+        if self.history:
+            self.history.close()
+            self.history = None
+
+    def print_negative(self, negative: Dict[str, str]):
+        """Report sources skipped because of the negative cache"""
+        if not negative:
+            return
+        reasons: Dict[str, int] = {}
+        for reason in negative.values():
+            reasons[reason] = reasons.get(reason, 0) + 1
+        summary = ", ".join(f"{reason}: {count}" for reason, count in sorted(reasons.items()))
+        print(f"⏭️  Skipping {len(negative)} negatively cached sources ({summary})")
+
+    def save_manifest(self, output_file: str):
+        """Write the manifest (atomically replacing any previous file)"""
         print(f"\n💾 Saving manifest to {output_file}...")
         manifest_obj = {
             "packages": self.packages,
@@ -716,21 +2209,52 @@ class ManifestGenerator:
         if self.scripts:
             manifest_obj["scripts"] = self.scripts
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(manifest_obj, f, indent=2, ensure_ascii=False)
+        write_json_atomic(output_file, manifest_obj)
+        self.coverage = CoverageIndex.from_manifest(manifest_obj)
+        write_json_atomic(coverage_path(output_file), self.coverage.to_dict())
+        if self.history_depth:
+            self.save_history(output_file)
+
+    def save_history(self, output_file: str):
+        """
+        Write <name>.history.json: per package, the versions with platform
+        assets among its newest releases. Packages that were not refreshed
+        keep their versions from the previous history file.
+        """
+        history_file = history_path(output_file)
+        previous = {}
+        if os.path.exists(history_file):
+            try:
+                with open(history_file, "r", encoding="utf-8") as f:
+                    previous = json.load(f).get("packages", {})
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Cannot read previous history {history_file}: {e}")
+
+        packages = {}
+        for package in self.packages:
+            name = package["name"]
+            versions = self.versions.get(name, previous.get(name))
+            if versions:
+                packages[name] = versions
+
+        write_json_atomic(history_file, {
+            "packages": packages,
+            "depth": self.history_depth,
+            "last_updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        })
 
-        # Summary
+    def print_summary(self, output_file: str, total_sources: int):
+        """Print generation summary and coverage statistics"""
         print("\n" + "=" * 50)
         print("✅ Generation complete!")
-        print(f"   Total packages: {len(self.packages)}/{len(urls)}")
+        print(f"   Total packages: {len(self.packages)}/{total_sources}")
         print(f"   Total scripts: {len(self.scripts)}")
-        print(f"   Output file: {output_file}")
+        print(f"   Output file: {output_file} (+ {coverage_path(output_file)})")
+        if self.history_depth:
+            print(f"   Release history: {history_path(output_file)} ({len(self.versions)} refreshed)")
 
         # Platform statistics
-        platform_stats = {}
-        for pkg in self.packages:
-            for platform in pkg["platforms"].keys():
-                platform_stats[platform] = platform_stats.get(platform, 0) + 1
+        platform_stats = self.coverage.counts()
 
         if platform_stats:
             print("\n📊 Platform coverage:")
@@ -741,7 +2265,7 @@ class ManifestGenerator:
         if self.scripts:
             script_type_stats = {}
             for script in self.scripts:
-                script_type = script["script_type"]
+                script_type = script.get("script_type", "unknown")
                 script_type_stats[script_type] = script_type_stats.get(script_type, 0) + 1
 
             print("\n📜 Script types:")
@@ -777,7 +2301,86 @@ def main():
     parser.add_argument(
         "-t",
         "--token",
-        help="GitHub personal access token (or use GITHUB_TOKEN env var)",
+        action="append",
+        help="GitHub personal access token; repeat to use a pool of tokens, each "
+        "request going to the token with the most remaining quota "
+        "(or use GITHUB_TOKENS=a,b / GITHUB_TOKEN env vars)",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Print an asset selection report for every package",
+    )
+    parser.add_argument(
+        "--budget",
+        type=parse_budget,
+        help="API request budget for package refresh: a number or 'auto' (derive "
+        "from remaining quota). Stale, frequently releasing repos are refreshed "
+        "first; the rest are carried over from the previous manifest",
+    )
+    parser.add_argument(
+        "--check-feeds",
+        action="store_true",
+        help="Check releases.atom feeds first (no API quota) and only refresh "
+        "repos with a new release; unchanged repos are carried over. Repos never "
+        "checked before are compared with the previous manifest's release tag",
+    )
+    parser.add_argument(
+        "--introspect",
+        action="store_true",
+        help="Record the executables inside each selected archive (zip via HTTP "
+        "Range requests, tar archives streamed without saving)",
+    )
+    parser.add_argument(
+        "--history-db",
+        help="SQLite file recording releases, assets, selections and fetch "
+        "timings of every run (query it with history_store.py)",
+    )
+    parser.add_argument(
+        "--changed-only",
+        nargs="?",
+        const="",
+        metavar="GIT_REF",
+        help="Only fetch sources added since GIT_REF (e.g. HEAD~1) or, without "
+        "a ref, since the last run's snapshot; drop removed sources and leave "
+        "other manifest entries untouched",
+    )
+    parser.add_argument(
+        "--history-depth",
+        type=int,
+        default=0,
+        metavar="N",
+        help="List the newest N releases of every refreshed repo (pages of "
+        f"{RELEASES_PER_PAGE} fetched concurrently, conditional requests cached "
+        "in the cache dir) and write <name>.history.json with the platform "
+        "assets of each version. The newest release with assets is used even "
+        "if the repo only has prereleases or its latest release lacks assets",
+    )
+    parser.add_argument(
+        "--metadata-ttl",
+        type=float,
+        default=METADATA_TTL_DAYS,
+        metavar="DAYS",
+        help="Days to reuse cached repo metadata (description, homepage, "
+        f"license) before fetching it again (default: {METADATA_TTL_DAYS}); "
+        "release data is fetched on every refresh",
+    )
+    parser.add_argument(
+        "--refresh-metadata",
+        action="store_true",
+        help="Fetch repo metadata for every refreshed repo, ignoring the cache",
+    )
+    parser.add_argument(
+        "--ignore-negative-cache",
+        action="store_true",
+        help="Fetch sources that recently produced no entry (no releases, no "
+        "binary assets, 404, invalid URL) instead of skipping them until their "
+        "cache entry expires",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for state kept between runs (default: {DEFAULT_CACHE_DIR})",
     )
 
     args = parser.parse_args()
@@ -788,9 +2391,31 @@ def main():
         sys.exit(1)
 
     # Generate manifest
+    generator = None
     try:
-        generator = ManifestGenerator(args.token)
-        generator.generate(args.sources, args.scripts, args.output)
+        generator = ManifestGenerator(
+            args.token,
+            explain=args.explain,
+            cache_dir=args.cache_dir,
+            introspect=args.introspect,
+            history_db=args.history_db,
+            use_negative_cache=not args.ignore_negative_cache,
+            metadata_ttl=args.metadata_ttl,
+            refresh_metadata=args.refresh_metadata,
+            history_depth=args.history_depth,
+        )
+        if args.changed_only is not None:
+            generator.generate_changed(
+                args.sources, args.scripts, args.output, base_ref=args.changed_only or None
+            )
+        else:
+            generator.generate(
+                args.sources,
+                args.scripts,
+                args.output,
+                budget=args.budget,
+                check_feeds=args.check_feeds,
+            )
     except KeyboardInterrupt:
         print("\n\n⚠️  Generation interrupted by user")
         sys.exit(1)
@@ -800,6 +2425,9 @@ def main():
 
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if generator is not None:
+            generator.close()
 
 
 if __name__ == "__main__":
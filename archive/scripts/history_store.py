@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Wenget Bucket Release History Store
+
+SQLite record of every generator run: observed releases and their assets,
+the selected platform entries and per-repo fetch timings. Serves as a local
+source for incremental runs and for queries such as the size trend of a
+platform asset or which repos dropped a platform.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+from typing import Dict, List, Optional, Any, Tuple
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS repos (
+    repo TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    html_url TEXT,
+    homepage TEXT,
+    license TEXT,
+    updated_run INTEGER REFERENCES runs(id)
+);
+CREATE TABLE IF NOT EXISTS releases (
+    repo TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    published_at TEXT,
+    prerelease INTEGER NOT NULL DEFAULT 0,
+    first_seen_run INTEGER REFERENCES runs(id),
+    PRIMARY KEY (repo, tag)
+);
+CREATE TABLE IF NOT EXISTS assets (
+    repo TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER,
+    url TEXT,
+    PRIMARY KEY (repo, tag, name)
+);
+CREATE TABLE IF NOT EXISTS selections (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    repo TEXT NOT NULL,
+    tag TEXT,
+    platform TEXT NOT NULL,
+    url TEXT NOT NULL,
+    size INTEGER,
+    PRIMARY KEY (run_id, repo, platform)
+);
+CREATE TABLE IF NOT EXISTS fetch_timings (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    repo TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_releases_tag ON releases (tag);
+CREATE INDEX IF NOT EXISTS idx_assets_tag ON assets (tag);
+CREATE INDEX IF NOT EXISTS idx_selections_repo_platform ON selections (repo, platform);
+CREATE INDEX IF NOT EXISTS idx_selections_platform ON selections (platform);
+CREATE INDEX IF NOT EXISTS idx_selections_tag ON selections (tag);
+CREATE INDEX IF NOT EXISTS idx_fetch_timings_repo ON fetch_timings (repo);
+CREATE INDEX IF NOT EXISTS idx_repos_name ON repos (name);
+"""
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+class HistoryStore:
+    """SQLite-backed release history (repo keys are "owner/repo", lowercase)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # === WRITING ===
+
+    def start_run(self) -> int:
+        with self.conn:
+            cursor = self.conn.execute("INSERT INTO runs (started_at) VALUES (?)", (_now(),))
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int):
+        with self.conn:
+            self.conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (_now(), run_id))
+
+    def record_package(
+        self,
+        run_id: int,
+        repo: str,
+        release: Dict[str, Any],
+        package: Dict[str, Any],
+    ):
+        """
+        Record repo metadata, the release with all its assets and the selected
+        platforms. A release without usable assets is recorded with empty
+        platforms: it adds no selections, so latest_package() is unaffected.
+        """
+        tag = release.get("tag_name")
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO repos "
+                "(repo, name, description, html_url, homepage, license, updated_run) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    repo,
+                    package["name"],
+                    package.get("description"),
+                    package.get("repo"),
+                    package.get("homepage"),
+                    package.get("license"),
+                    run_id,
+                ),
+            )
+            if tag:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO releases "
+                    "(repo, tag, published_at, prerelease, first_seen_run) VALUES (?, ?, ?, ?, ?)",
+                    (repo, tag, release.get("published_at"), int(bool(release.get("prerelease"))), run_id),
+                )
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO assets (repo, tag, name, size, url) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (repo, tag, a["name"], a.get("size"), a.get("browser_download_url"))
+                        for a in release.get("assets", [])
+                    ],
+                )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO selections (run_id, repo, tag, platform, url, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, repo, tag, platform, info["url"], info.get("size"))
+                    for platform, info in package.get("platforms", {}).items()
+                ],
+            )
+
+    def record_timing(self, run_id: int, repo: str, seconds: float, status: str):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO fetch_timings (run_id, repo, seconds, status) VALUES (?, ?, ?, ?)",
+                (run_id, repo, seconds, status),
+            )
+
+    # === READING ===
+
+    def resolve_repo(self, repo_or_name: str) -> Optional[str]:
+        """Map a package name or repo key to a repo key"""
+        row = self.conn.execute(
+            "SELECT repo FROM repos WHERE repo = ? OR name = ? LIMIT 1",
+            (repo_or_name.lower(), repo_or_name),
+        ).fetchone()
+        return row["repo"] if row else None
+
+    def latest_package(self, repo: str) -> Optional[Dict[str, Any]]:
+        """Rebuild the most recently selected manifest entry for repo"""
+        meta = self.conn.execute("SELECT * FROM repos WHERE repo = ?", (repo,)).fetchone()
+        if not meta:
+            return None
+        run = self.conn.execute(
+            "SELECT MAX(run_id) AS run_id FROM selections WHERE repo = ?", (repo,)
+        ).fetchone()["run_id"]
+        if run is None:
+            return None
+
+        rows = self.conn.execute(
+            "SELECT platform, url, size FROM selections WHERE repo = ? AND run_id = ? ORDER BY platform",
+            (repo, run),
+        ).fetchall()
+        return {
+            "name": meta["name"],
+            "description": meta["description"] or "",
+            "repo": meta["html_url"],
+            "homepage": meta["homepage"],
+            "license": meta["license"],
+            "platforms": {r["platform"]: {"url": r["url"], "size": r["size"]} for r in rows},
+        }
+
+    def size_trend(
+        self, repo: str, platform: str
+    ) -> List[Tuple[str, Optional[str], Optional[int]]]:
+        """Return (tag, published_at, size) of the selected asset for every release seen"""
+        rows = self.conn.execute(
+            "SELECT s.tag, r.published_at, s.size, MAX(s.run_id) AS run_id "
+            "FROM selections s LEFT JOIN releases r ON r.repo = s.repo AND r.tag = s.tag "
+            "WHERE s.repo = ? AND s.platform = ? "
+            "GROUP BY s.tag ORDER BY run_id",
+            (repo, platform),
+        ).fetchall()
+        return [(r["tag"], r["published_at"], r["size"]) for r in rows]
+
+    def dropped_platforms(self) -> Dict[str, List[str]]:
+        """Repos whose latest selection lacks platforms present in their previous one"""
+        dropped = {}
+        rows = self.conn.execute(
+            "SELECT repo, run_id, GROUP_CONCAT(platform) AS platforms "
+            "FROM selections GROUP BY repo, run_id ORDER BY repo, run_id DESC"
+        ).fetchall()
+
+        runs_by_repo: Dict[str, List[set]] = {}
+        for row in rows:
+            runs_by_repo.setdefault(row["repo"], []).append(set(row["platforms"].split(",")))
+
+        for repo, runs in runs_by_repo.items():
+            if len(runs) >= 2 and runs[1] - runs[0]:
+                dropped[repo] = sorted(runs[1] - runs[0])
+        return dropped
+
+    def slowest_fetches(self, limit: int = 10) -> List[Tuple[str, float, int]]:
+        """Return (repo, average seconds, fetch count) ordered by average time"""
+        rows = self.conn.execute(
+            "SELECT repo, AVG(seconds) AS avg_seconds, COUNT(*) AS fetches "
+            "FROM fetch_timings GROUP BY repo ORDER BY avg_seconds DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [(r["repo"], r["avg_seconds"], r["fetches"]) for r in rows]
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the Wenget bucket release history")
+    parser.add_argument("db", help="History database written by generate_manifest.py --history-db")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    trend = subparsers.add_parser("size-trend", help="Asset size per release for a platform")
+    trend.add_argument("package", help="Package name or owner/repo")
+    trend.add_argument("platform", help="Platform key, e.g. linux-aarch64")
+
+    subparsers.add_parser("dropped-platforms", help="Repos that lost platforms in their latest run")
+
+    slow = subparsers.add_parser("slowest", help="Repos with the slowest average fetch")
+    slow.add_argument("-n", "--limit", type=int, default=10)
+
+    args = parser.parse_args()
+
+    # Opening a missing path would silently create an empty database
+    if not os.path.exists(args.db):
+        print(f"❌ Error: History database '{args.db}' not found")
+        sys.exit(1)
+    store = HistoryStore(args.db)
+
+    try:
+        if args.command == "size-trend":
+            repo = store.resolve_repo(args.package)
+            if not repo:
+                print(f"❌ Unknown package: {args.package}")
+                sys.exit(1)
+            for tag, published_at, size in store.size_trend(repo, args.platform):
+                size_text = f"{size:,}" if size is not None else "-"
+                print(f"   {tag:<24} {published_at or '-':<22} {size_text:>14}")
+
+        elif args.command == "dropped-platforms":
+            dropped = store.dropped_platforms()
+            if not dropped:
+                print("✅ No platforms dropped")
+            for repo, platforms in sorted(dropped.items()):
+                print(f"   {repo}: {', '.join(platforms)}")
+
+        elif args.command == "slowest":
+            for repo, seconds, fetches in store.slowest_fetches(args.limit):
+                print(f"   {repo:<40} {seconds:6.2f}s avg over {fetches} fetches")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Wenget Bucket Server Load Test
+
+Hammers a manifest URL (e.g. from serve_manifest.py) with keep-alive
+connections and reports requests per second and latency percentiles. With
+--conditional, clients poll like real ones: revalidate with If-None-Match
+and expect 304 responses.
+"""
+
+import sys
+import time
+import threading
+import http.client
+from urllib.parse import urlparse
+from typing import Dict, List, Optional
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# Configuration
+DEFAULT_CONCURRENCY = 16
+DEFAULT_REQUESTS = 10000
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class LoadTester:
+    """Run requests from worker threads, each on its own keep-alive connection"""
+
+    def __init__(self, url: str, conditional: bool = False, accept_gzip: bool = False):
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL: {url}")
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.path = parsed.path or "/"
+        if parsed.query:
+            self.path += "?" + parsed.query
+        self.conditional = conditional
+        self.accept_gzip = accept_gzip
+
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self.errors = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=30)
+
+    def _worker(self, count: int):
+        conn = self._connect()
+        etag: Optional[str] = None
+        latencies = []
+        statuses: Dict[int, int] = {}
+        errors = received = 0
+
+        for _ in range(count):
+            headers = {"User-Agent": "Wenget-Bucket-LoadTest/1.0"}
+            if self.accept_gzip:
+                headers["Accept-Encoding"] = "gzip"
+            if self.conditional and etag:
+                headers["If-None-Match"] = etag
+
+            started = time.perf_counter()
+            try:
+                conn.request("GET", self.path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()
+                conn = self._connect()
+                continue
+            latencies.append(time.perf_counter() - started)
+
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+            received += len(body)
+            etag = response.getheader("ETag") or etag
+
+        conn.close()
+        with self._lock:
+            self.latencies.extend(latencies)
+            for status, n in statuses.items():
+                self.statuses[status] = self.statuses.get(status, 0) + n
+            self.errors += errors
+            self.bytes_received += received
+
+    def run(self, requests: int, concurrency: int) -> float:
+        """Run requests spread over concurrency workers; return elapsed seconds"""
+        share, extra = divmod(requests, concurrency)
+        threads = [
+            threading.Thread(target=self._worker, args=(share + (1 if i < extra else 0),))
+            for i in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    def report(self, elapsed: float):
+        latencies = sorted(self.latencies)
+        completed = len(latencies)
+        print(f"📊 {completed:,} requests in {elapsed:.2f}s")
+        print(f"   Throughput:  {completed / elapsed:12,.0f} req/s")
+        print(f"   Transferred: {self.bytes_received:12,} bytes")
+        for label, fraction in (("p50", 0.50), ("p90", 0.90), ("p99", 0.99)):
+            print(f"   {label} latency: {percentile(latencies, fraction) * 1000:9.2f} ms")
+        if latencies:
+            print(f"   max latency: {latencies[-1] * 1000:9.2f} ms")
+        statuses = ", ".join(f"{status}: {n:,}" for status, n in sorted(self.statuses.items()))
+        print(f"   Statuses:    {statuses or '-'}")
+        if self.errors:
+            print(f"⚠️  {self.errors} request(s) failed")
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test a Wenget bucket manifest server")
+    parser.add_argument(
+        "url",
+        nargs="?",
+        default="http://127.0.0.1:8080/manifest.json",
+        help="URL to request (default: http://127.0.0.1:8080/manifest.json)",
+    )
+    parser.add_argument(
+        "-n",
+        "--requests",
+        type=int,
+        default=DEFAULT_REQUESTS,
+        help=f"Total requests (default: {DEFAULT_REQUESTS})",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Concurrent keep-alive connections (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--conditional",
+        action="store_true",
+        help="Poll like clients do: send If-None-Match with the last ETag",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Send Accept-Encoding: gzip",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        tester = LoadTester(args.url, conditional=args.conditional, accept_gzip=args.gzip)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print("🏋️  Wenget Bucket Server Load Test")
+    print("=" * 50)
+    print(f"   {args.url}: {args.requests:,} requests, {args.concurrency} connections"
+          f"{', conditional' if args.conditional else ''}{', gzip' if args.gzip else ''}")
+
+    elapsed = tester.run(args.requests, max(args.concurrency, 1))
+    tester.report(elapsed)
+    sys.exit(1 if tester.errors or not tester.latencies else 0)
+
+
+if __name__ == "__main__":
+    main()
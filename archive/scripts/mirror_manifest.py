@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Wenget Bucket Mirror Builder
+
+Downloads the assets and scripts referenced by manifest.json into a
+content-addressed local store and writes a mirror manifest whose URLs
+point at a LAN base URL. Re-runs only download new or changed assets:
+release assets and commit-pinned URLs are reused as stored, other URLs
+(e.g. raw scripts on a branch) are revalidated with conditional requests.
+"""
+
+import os
+import re
+import sys
+import copy
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse, unquote
+from typing import Dict, List, Optional, Any, Tuple
+
+from atomic_json import write_json_atomic
+from generate_manifest import ScriptStore
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# Configuration
+USER_AGENT = "Wenget-Bucket-Mirror/1.0"
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_JOBS = 4
+
+# Release assets are immutable once uploaded under a tag
+RELEASE_ASSET_PATTERN = re.compile(r"github\.com/[^/]+/[^/]+/releases/download/")
+
+
+class AssetStore:
+    """
+    Content-addressed store for downloaded files.
+
+    Layout:
+        index.json                      - source URL -> {sha256, size, path}
+                                          (+ etag / last_modified validators)
+        objects/<sha[:2]>/<sha>/<name>  - file content, keeps the original filename
+        tmp/<url hash>.part             - partial downloads (resumed on next run)
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index_file = os.path.join(root, "index.json")
+        self.objects_dir = os.path.join(root, "objects")
+        self.tmp_dir = os.path.join(root, "tmp")
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        if os.path.exists(self.index_file):
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    @staticmethod
+    def is_immutable_url(url: str) -> bool:
+        """Whether the content behind url can never change (stored copies need no revalidation)"""
+        return bool(RELEASE_ASSET_PATTERN.search(url)) or ScriptStore.is_immutable_url(url)
+
+    def lookup(self, url: str, size: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for url if its object is present and intact"""
+        with self._lock:
+            entry = self.index.get(url)
+        if not entry:
+            return None
+
+        path = os.path.join(self.root, entry["path"])
+        if not os.path.exists(path) or os.path.getsize(path) != entry["size"]:
+            return None
+        if size is not None and entry["size"] != size:
+            return None
+        return entry
+
+    def download(
+        self, url: str, size: Optional[int] = None, cached: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Download url into the store (resuming a partial file) and index it.
+
+        cached is the stored entry of a mutable url: the request is made
+        conditional on its validators and a 304 returns cached unchanged.
+        """
+        part_file = os.path.join(
+            self.tmp_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".part"
+        )
+        offset = os.path.getsize(part_file) if os.path.exists(part_file) else 0
+        if offset and (cached or (size is not None and offset > size)):
+            # A partial file of a mutable url may belong to an older version
+            os.remove(part_file)
+            offset = 0
+
+        validators: Dict[str, str] = {}
+        if size is None or offset < size:
+            headers = {"User-Agent": USER_AGENT}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+            if cached and cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached and cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+            try:
+                response = urlopen(Request(url, headers=headers), timeout=60)
+            except HTTPError as e:
+                if e.code == 304 and cached:
+                    return cached
+                if e.code != 416:
+                    raise
+                # Range not satisfiable: the partial file is stale, start over
+                os.remove(part_file)
+                return self.download(url, size)
+
+            for field, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+                if response.headers.get(header):
+                    validators[field] = response.headers[header]
+
+            with response:
+                # Server ignored the Range header - restart from scratch
+                mode = "ab" if offset and response.status == 206 else "wb"
+                with open(part_file, mode) as f:
+                    while True:
+                        chunk = response.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+
+        actual_size = os.path.getsize(part_file)
+        if size is not None and actual_size != size:
+            os.remove(part_file)
+            raise ValueError(f"Size mismatch for {url}: expected {size}, got {actual_size}")
+
+        digest = hashlib.sha256()
+        with open(part_file, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+
+        filename = unquote(urlparse(url).path.rstrip("/").split("/")[-1]) or "download"
+        rel_path = "/".join(["objects", sha256[:2], sha256, filename])
+        path = os.path.join(self.root, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(part_file, path)
+
+        entry = {"sha256": sha256, "size": actual_size, "path": rel_path}
+        entry.update(validators)
+        with self._lock:
+            self.index[url] = entry
+        return entry
+
+    def save(self):
+        """Write the index atomically"""
+        with self._lock:
+            write_json_atomic(self.index_file, self.index, sort_keys=True)
+
+
+class MirrorBuilder:
+    """Mirror manifest assets and scripts into an AssetStore"""
+
+    def __init__(
+        self,
+        store: AssetStore,
+        base_url: str,
+        platforms: Optional[List[str]] = None,
+        include_scripts: bool = True,
+        jobs: int = DEFAULT_JOBS,
+    ):
+        self.store = store
+        self.base_url = base_url.rstrip("/")
+        self.platforms = set(platforms) if platforms else None
+        self.include_scripts = include_scripts
+        self.jobs = jobs
+        self.errors: List[str] = []
+
+    @staticmethod
+    def _script_targets(script: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the dicts holding script URLs (flat or per-platform format)"""
+        if "url" in script:
+            return [script]
+        return [p for p in script.get("platforms", {}).values() if "url" in p]
+
+    def collect_targets(self, manifest: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return every manifest entry dict (holding url/size) selected for mirroring"""
+        targets = []
+        for package in manifest.get("packages", []):
+            for platform, info in package.get("platforms", {}).items():
+                if self.platforms is None or platform in self.platforms:
+                    targets.append(info)
+
+        if self.include_scripts:
+            for script in manifest.get("scripts", []):
+                targets.extend(self._script_targets(script))
+
+        return targets
+
+    def _fetch(self, url: str, size: Optional[int]) -> Tuple[Dict[str, Any], bool]:
+        """Return (store entry, downloaded) for url"""
+        entry = self.store.lookup(url, size)
+        if entry and AssetStore.is_immutable_url(url):
+            return entry, False
+        # Mutable url (e.g. a script on a branch): a matching size proves nothing
+        fetched = self.store.download(url, size, cached=entry)
+        return fetched, fetched is not entry
+
+    def build(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """Mirror all selected targets and return the rewritten manifest"""
+        mirror = copy.deepcopy(manifest)
+        targets = self.collect_targets(mirror)
+
+        # Several entries may share one URL - download each URL once
+        urls: Dict[str, Optional[int]] = {}
+        for info in targets:
+            urls.setdefault(info["url"], info.get("size"))
+
+        results: Dict[str, Dict[str, Any]] = {}
+        downloaded = 0
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            futures = {
+                executor.submit(self._fetch, url, size): url
+                for url, size in urls.items()
+            }
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    entry, fetched = future.result()
+                except (HTTPError, URLError, OSError, ValueError) as e:
+                    self.errors.append(f"{url}: {e}")
+                    print(f"   ❌ {url}: {e}")
+                    continue
+
+                results[url] = entry
+                if fetched:
+                    downloaded += 1
+                    print(f"   ⬇️  {entry['path']} ({entry['size']:,} bytes)")
+
+        print(f"✓ {downloaded} downloaded, {len(results) - downloaded} already in store")
+
+        # Rewrite URLs; entries that failed keep pointing upstream
+        for info in targets:
+            entry = results.get(info["url"])
+            if entry:
+                info["url"] = f"{self.base_url}/{entry['path']}"
+                if "size" in info:
+                    info["size"] = entry["size"]
+
+        mirror["last_updated"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        return mirror
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Mirror Wenget bucket assets into a content-addressed local store"
+    )
+    parser.add_argument(
+        "manifest",
+        nargs="?",
+        default="manifest.json",
+        help="Manifest file to mirror (default: manifest.json)",
+    )
+    parser.add_argument(
+        "-d",
+        "--store",
+        default="mirror",
+        help="Store directory (default: mirror)",
+    )
+    parser.add_argument(
+        "-b",
+        "--base-url",
+        required=True,
+        help="Base URL the store directory is served from, e.g. http://mirror.lan/bucket",
+    )
+    parser.add_argument(
+        "-p",
+        "--platform",
+        action="append",
+        help="Platform key to mirror (repeatable, default: all platforms)",
+    )
+    parser.add_argument(
+        "--no-scripts",
+        action="store_true",
+        help="Do not mirror scripts",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Concurrent downloads (default: {DEFAULT_JOBS})",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Mirror manifest file (default: <store>/manifest.json)",
+    )
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.manifest):
+        print(f"❌ Error: Manifest file '{args.manifest}' not found")
+        sys.exit(1)
+
+    print("🪞 Wenget Bucket Mirror Builder")
+    print("=" * 50)
+
+    with open(args.manifest, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    store = AssetStore(args.store)
+    builder = MirrorBuilder(
+        store,
+        args.base_url,
+        platforms=args.platform,
+        include_scripts=not args.no_scripts,
+        jobs=args.jobs,
+    )
+
+    try:
+        mirror = builder.build(manifest)
+    finally:
+        store.save()
+
+    output_file = args.output or os.path.join(args.store, "manifest.json")
+    write_json_atomic(output_file, mirror)
+
+    print(f"\n💾 Mirror manifest saved to {output_file}")
+    if builder.errors:
+        print(f"⚠️  {len(builder.errors)} download(s) failed, kept upstream URLs")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
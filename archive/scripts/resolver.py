@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Wenget Bucket Asset Resolver
+
+Loads a manifest once and precomputes (package, host) -> best asset lookup
+tables, including fallback chains (musl <-> gnu, armv7 -> armv6,
+aarch64-darwin -> x86_64-darwin, ...). Each lookup is then a dict access.
+"""
+
+import sys
+import json
+import time
+import random
+from typing import Dict, List, Optional, Any, Tuple
+
+from generate_manifest import PlatformDetector
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+
+class ManifestResolver:
+    """
+    Resolve the best asset of a package for a host.
+
+    Platform keys are canonicalized to "{os}-{arch}[-{abi}]" with os in
+    linux/darwin/windows/freebsd ("macos" keys become "darwin") and abi in
+    musl/gnu/msvc, so manifests from either generator resolve alike.
+    """
+
+    # Architectures a host can run besides its own, in preference order
+    ARCH_FALLBACKS: Dict[Tuple[str, str], List[str]] = {
+        ("linux", "armv7"): ["armv6"],
+        ("darwin", "aarch64"): ["x86_64"],  # Rosetta 2
+        ("windows", "aarch64"): ["x86_64", "i686"],  # Windows on ARM emulation
+        ("windows", "x86_64"): ["i686"],  # WoW64
+    }
+
+    # ABI preference per (os, host abi); None = key without ABI suffix
+    ABI_FALLBACKS: Dict[Tuple[str, Optional[str]], List[Optional[str]]] = {
+        ("linux", "musl"): ["musl", None, "gnu"],
+        ("linux", "gnu"): ["gnu", None, "musl"],
+        ("linux", None): ["musl", None, "gnu"],
+        ("windows", "msvc"): ["msvc", None, "gnu"],
+        ("windows", "gnu"): ["gnu", None, "msvc"],
+        ("windows", None): ["msvc", None, "gnu"],
+    }
+
+    OS_ALIASES: Dict[str, str] = {"macos": "darwin"}
+
+    def __init__(self, manifest: Dict[str, Any]):
+        packages = manifest.get("packages", []) if isinstance(manifest, dict) else manifest
+
+        # package -> canonical key -> (manifest key, asset)
+        self.assets: Dict[str, Dict[str, Tuple[str, Dict[str, Any]]]] = {}
+        hosts = set()
+        for package in packages:
+            canonical = {}
+            for key, info in package.get("platforms", {}).items():
+                canonical_key = self.canonical_key(key)
+                # First listed wins if two manifest keys collapse to one canonical key
+                canonical.setdefault(canonical_key, (key, info))
+                hosts.add(canonical_key)
+            self.assets[package["name"]] = canonical
+
+        self._host_cache: Dict[str, str] = {}
+        self.table: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+        for host in hosts:
+            self._build_host(host)
+
+    # === KEY NORMALIZATION ===
+
+    @staticmethod
+    def _abi_family(compiler: str) -> Optional[str]:
+        if compiler.startswith("musl"):
+            return "musl"
+        if compiler.startswith("gnu"):
+            return "gnu"
+        return compiler or None
+
+    @classmethod
+    def _join(cls, os_name: str, arch: Optional[str], abi: Optional[str]) -> str:
+        return "-".join(part for part in (os_name, arch, abi) if part)
+
+    @classmethod
+    def canonical_key(cls, key: str) -> str:
+        """Canonicalize a manifest platform key ("macos-x86_64" -> "darwin-x86_64")"""
+        parts = key.lower().split("-")
+        os_name = cls.OS_ALIASES.get(parts[0], parts[0])
+        arch = PlatformDetector.ARCH_KEYWORDS.get(parts[1], parts[1]) if len(parts) > 1 else None
+        abi = cls._abi_family(parts[2]) if len(parts) > 2 else None
+        return cls._join(os_name, arch, abi)
+
+    def canonical_host(self, host: str) -> str:
+        """
+        Canonicalize a host given as a target triple
+        ("aarch64-unknown-linux-musl") or as a platform key ("linux-aarch64-musl").
+        """
+        cached = self._host_cache.get(host)
+        if cached is not None:
+            return cached
+
+        os_name = PlatformDetector._extract_platform(host, "")
+        if os_name is None:
+            raise ValueError(f"Unknown host platform: {host}")
+        arch = PlatformDetector._extract_architecture(host, os_name)
+        if arch in (None, "SKIP"):
+            arch = PlatformDetector.ARCH_DEFAULTS.get(os_name)
+        abi = self._abi_family(PlatformDetector._extract_compiler(host))
+        if os_name == "darwin":
+            abi = None
+
+        canonical = self._join(os_name, arch, abi)
+        self._host_cache[host] = canonical
+        return canonical
+
+    # === FALLBACK CHAINS ===
+
+    def fallback_chain(self, host: str) -> List[str]:
+        """Canonical keys a canonical host can use, most preferred first"""
+        parts = host.split("-")
+        os_name = parts[0]
+        arch = parts[1] if len(parts) > 1 else None
+        abi = parts[2] if len(parts) > 2 else None
+
+        archs = [arch] + self.ARCH_FALLBACKS.get((os_name, arch), []) if arch else []
+        abis = self.ABI_FALLBACKS.get((os_name, abi), [abi] if abi else [None])
+
+        chain = []
+        for candidate_arch in archs:
+            for candidate_abi in abis:
+                key = self._join(os_name, candidate_arch, candidate_abi)
+                if key not in chain:
+                    chain.append(key)
+        # Last resort: a key without architecture (e.g. bare "darwin")
+        chain.append(os_name)
+        return chain
+
+    def _build_host(self, host: str):
+        """Fill the lookup table column of one canonical host"""
+        chain = self.fallback_chain(host)
+        for name, canonical in self.assets.items():
+            best = None
+            for key in chain:
+                if key in canonical:
+                    manifest_key, info = canonical[key]
+                    best = dict(info, platform=manifest_key)
+                    break
+            self.table[(name, host)] = best
+
+    # === LOOKUP ===
+
+    def resolve(self, package: str, host: str) -> Optional[Dict[str, Any]]:
+        """Return the best asset (with its manifest "platform" key) or None"""
+        canonical = self.canonical_host(host)
+        try:
+            return self.table[(package, canonical)]
+        except KeyError:
+            if package not in self.assets:
+                return None
+            # Host not seen in the manifest: build its column once
+            self._build_host(canonical)
+            return self.table[(package, canonical)]
+
+    def resolve_many(self, packages: List[str], host: str) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Resolve many packages for one host (e.g. fleet provisioning)"""
+        canonical = self.canonical_host(host)
+        table = self.table
+        if any((name, canonical) not in table for name in packages if name in self.assets):
+            self._build_host(canonical)
+        return {name: table.get((name, canonical)) for name in packages}
+
+
+def synthetic_manifest(package_count: int, seed: int = 0) -> Dict[str, Any]:
+    """Manifest with package_count packages over a realistic mix of platform keys"""
+    rng = random.Random(seed)
+    keys = [
+        "linux-x86_64", "linux-x86_64-musl", "linux-x86_64-gnu",
+        "linux-aarch64", "linux-aarch64-musl", "linux-aarch64-gnu",
+        "linux-armv7-musl", "linux-armv7-gnu", "linux-armv6", "linux-i686-musl",
+        "macos-x86_64", "macos-aarch64", "windows-x86_64-msvc", "windows-x86_64",
+        "windows-i686", "windows-aarch64-msvc", "freebsd-x86_64",
+    ]
+    packages = []
+    for i in range(package_count):
+        platforms = {
+            key: {"url": f"https://example.invalid/pkg{i}/{key}.tar.gz", "size": rng.randint(1, 10 ** 8)}
+            for key in rng.sample(keys, rng.randint(3, len(keys)))
+        }
+        packages.append({"name": f"pkg{i}", "platforms": platforms})
+    return {"packages": packages}
+
+
+def run_benchmark(package_count: int, lookups: int):
+    """Print build time and resolve / resolve_many throughput"""
+    hosts = [
+        "x86_64-unknown-linux-gnu", "x86_64-unknown-linux-musl",
+        "aarch64-unknown-linux-musl", "armv7-unknown-linux-gnueabihf",
+        "aarch64-apple-darwin", "x86_64-apple-darwin",
+        "x86_64-pc-windows-msvc", "aarch64-pc-windows-msvc",
+    ]
+    manifest = synthetic_manifest(package_count)
+    names = [pkg["name"] for pkg in manifest["packages"]]
+
+    started = time.perf_counter()
+    resolver = ManifestResolver(manifest)
+    for host in hosts:
+        resolver.resolve(names[0], host)  # build columns for triples not in the manifest
+    build_seconds = time.perf_counter() - started
+
+    rng = random.Random(1)
+    queries = [(rng.choice(names), rng.choice(hosts)) for _ in range(lookups)]
+    started = time.perf_counter()
+    for name, host in queries:
+        resolver.resolve(name, host)
+    resolve_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rounds = max(lookups // len(names), 1)
+    for i in range(rounds):
+        resolver.resolve_many(names, hosts[i % len(hosts)])
+    many_seconds = time.perf_counter() - started
+
+    print(f"📦 {package_count:,} packages, {len(resolver.table):,} table entries")
+    print(f"   Build tables:  {build_seconds * 1000:10.1f} ms")
+    print(f"   resolve():     {lookups / resolve_seconds:12,.0f} lookups/s")
+    print(f"   resolve_many(): {rounds * len(names) / many_seconds:11,.0f} lookups/s")
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resolve Wenget bucket assets for a host")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    resolve = subparsers.add_parser("resolve", help="Resolve packages for a host")
+    resolve.add_argument("host", help="Host triple or platform key, e.g. aarch64-apple-darwin")
+    resolve.add_argument("packages", nargs="+", help="Package names")
+    resolve.add_argument(
+        "-m",
+        "--manifest",
+        default="manifest.json",
+        help="Manifest file (default: manifest.json)",
+    )
+
+    bench = subparsers.add_parser("bench", help="Benchmark on a synthetic manifest")
+    bench.add_argument("-n", "--packages", type=int, default=5000, help="Package count (default: 5000)")
+    bench.add_argument("-l", "--lookups", type=int, default=1000000, help="Lookups (default: 1000000)")
+
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        run_benchmark(args.packages, args.lookups)
+        return
+
+    with open(args.manifest, "r", encoding="utf-8") as f:
+        resolver = ManifestResolver(json.load(f))
+
+    try:
+        print(f"🖥️  Host: {args.host} -> {resolver.canonical_host(args.host)}")
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    missing = 0
+    for name, asset in resolver.resolve_many(args.packages, args.host).items():
+        if asset:
+            print(f"   ✓ {name} [{asset['platform']}] {asset['url']}")
+        else:
+            print(f"   ✗ {name}: no asset for this host")
+            missing += 1
+
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Wenget Bucket Manifest Server
+
+Threaded HTTP server for a generated manifest and its derived artifacts
+(<name>.coverage.json, <name>.index.json, <name>.history.json). Clients poll cheaply:
+- strong ETags from the content digest, 304 on If-None-Match
+- gzip representation compressed once per file version
+- single-range Range / If-Range requests
+- hot reload: files atomically replaced by the generator are picked up on
+  the next request, never served half-written
+"""
+
+import os
+import re
+import sys
+import gzip
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from email.utils import formatdate
+from typing import Dict, List, Optional, Tuple
+
+from coverage_index import coverage_path
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# Configuration
+DEFAULT_BIND = "127.0.0.1"
+DEFAULT_PORT = 8080
+GZIP_LEVEL = 9  # compressed once per version, so spend the CPU
+CACHE_CONTROL = "no-cache"  # always revalidate; a 304 costs almost nothing
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def derived_artifacts(manifest_file: str) -> List[str]:
+    """Files written next to a manifest by the generator and the aggregator"""
+    root, ext = os.path.splitext(manifest_file)
+    return [
+        coverage_path(manifest_file),
+        f"{root}.index{ext or '.json'}",
+        f"{root}.history{ext or '.json'}",
+    ]
+
+
+class Representation:
+    """One servable body with its validators"""
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.etag = etag
+
+
+class FileVersion:
+    """Identity and gzip representations of one version of a file"""
+
+    def __init__(self, body: bytes, mtime: float):
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.identity = Representation(body, f'"{digest}"')
+        self.gzipped = Representation(
+            gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), f'"{digest}-gz"'
+        )
+        self.last_modified = formatdate(mtime, usegmt=True)
+
+
+class ServedFile:
+    """
+    A file on disk and its current FileVersion.
+
+    The version is rebuilt only when the file's (inode, size, mtime)
+    changes; an atomic replace always yields a new inode, so a reload never
+    sees a partially written file. Requests keep the version they started
+    with while a reload swaps in the next one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version: Optional[FileVersion] = None
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[FileVersion]:
+        """Reload if the file changed; None if it does not exist"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if signature == self._signature:
+            return self.version
+
+        with self._lock:
+            if signature != self._signature:
+                try:
+                    with open(self.path, "rb") as f:
+                        body = f.read()
+                except FileNotFoundError:
+                    return None
+                self.version = FileVersion(body, stat.st_mtime)
+                self._signature = signature
+                print(
+                    f"🔄 Loaded {self.path} ({len(body):,} bytes, "
+                    f"{len(self.version.gzipped.body):,} gzipped)"
+                )
+        return self.version
+
+
+class ManifestRequestHandler(BaseHTTPRequestHandler):
+    """Serve the files registered on the server (GET and HEAD)"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive for polling clients
+    # Headers and body are separate writes; Nagle + delayed ACK would add ~40ms
+    disable_nagle_algorithm = True
+    server_version = "Wenget-Bucket-Server/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    @staticmethod
+    def _accepts_gzip(header: Optional[str]) -> bool:
+        for coding in (header or "").split(","):
+            parts = coding.strip().split(";")
+            if parts[0].strip().lower() in ("gzip", "*"):
+                q = parts[1].strip() if len(parts) > 1 else "q=1"
+                return q not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+        return False
+
+    @staticmethod
+    def _etag_matches(header: Optional[str], etag: str) -> bool:
+        if not header:
+            return False
+        if header.strip() == "*":
+            return True
+        # Weak comparison for If-None-Match (W/ prefixes are ignored)
+        return any(tag.strip().replace("W/", "", 1) == etag for tag in header.split(","))
+
+    @staticmethod
+    def _parse_range(header: str, length: int) -> Optional[Tuple[int, int]]:
+        """
+        Return (start, end inclusive) for a single byte range, or None to
+        ignore the header. Raises ValueError if the range is unsatisfiable.
+        """
+        match = RANGE_PATTERN.match(header.strip())
+        if not match or match.group(1) == match.group(2) == "":
+            return None  # multiple or malformed ranges: serve the full body
+        first, last = match.groups()
+        if first == "":
+            suffix = int(last)
+            if suffix == 0:
+                raise ValueError("empty suffix range")
+            return max(length - suffix, 0), length - 1
+        start = int(first)
+        end = min(int(last), length - 1) if last else length - 1
+        if start >= length or start > end:
+            raise ValueError("range not satisfiable")
+        return start, end
+
+    def _send(self, status: int, headers: Dict[str, str], body: bytes = b""):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD" and body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        served = self.server.files.get(path)
+        version = served.current() if served else None
+        if version is None:
+            self._send(404, {"Content-Type": "text/plain; charset=utf-8"}, b"Not Found\n")
+            return
+
+        use_gzip = self._accepts_gzip(self.headers.get("Accept-Encoding"))
+        rep = version.gzipped if use_gzip else version.identity
+        headers = {
+            "ETag": rep.etag,
+            "Last-Modified": version.last_modified,
+            "Cache-Control": CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+            "Accept-Ranges": "bytes",
+        }
+
+        if self._etag_matches(self.headers.get("If-None-Match"), rep.etag):
+            self._send(304, headers)
+            return
+
+        headers["Content-Type"] = "application/json"
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        # If-Range with a stale validator means: send the whole new body
+        if range_header and (if_range is None or if_range.strip() == rep.etag):
+            try:
+                byte_range = self._parse_range(range_header, len(rep.body))
+            except ValueError:
+                headers["Content-Range"] = f"bytes */{len(rep.body)}"
+                self._send(416, headers)
+                return
+            if byte_range:
+                start, end = byte_range
+                headers["Content-Range"] = f"bytes {start}-{end}/{len(rep.body)}"
+                self._send(206, headers, rep.body[start:end + 1])
+                return
+
+        self._send(200, headers, rep.body)
+
+
+class ManifestServer(ThreadingHTTPServer):
+    """Threaded server mapping /<basename> to the served files"""
+
+    daemon_threads = True
+    request_queue_size = 1024  # many clients connecting at once (default is 5)
+
+    def __init__(self, address: Tuple[str, int], paths: List[str], verbose: bool = False):
+        super().__init__(address, ManifestRequestHandler)
+        self.verbose = verbose
+        self.files: Dict[str, ServedFile] = {}
+        for path in paths:
+            self.files["/" + os.path.basename(path)] = ServedFile(path)
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Serve a Wenget bucket manifest and its derived artifacts over HTTP"
+    )
+    parser.add_argument(
+        "manifests",
+        nargs="*",
+        default=["manifest.json"],
+        help="Manifest files to serve at /<filename>, together with their "
+        "<name>.coverage.json, <name>.index.json and <name>.history.json "
+        "(default: manifest.json)",
+    )
+    parser.add_argument(
+        "-b",
+        "--bind",
+        default=DEFAULT_BIND,
+        help=f"Address to bind (default: {DEFAULT_BIND})",
+    )
+    parser.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on (default: {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Log every request",
+    )
+
+    args = parser.parse_args()
+
+    paths = []
+    for manifest in args.manifests:
+        if not os.path.exists(manifest):
+            print(f"❌ Error: Manifest file '{manifest}' not found")
+            sys.exit(1)
+        paths.append(manifest)
+        paths.extend(derived_artifacts(manifest))
+
+    server = ManifestServer((args.bind, args.port), paths, verbose=args.verbose)
+    print("🌐 Wenget Bucket Manifest Server")
+    print("=" * 50)
+    for route, served in server.files.items():
+        note = "" if os.path.exists(served.path) else " (served once it exists)"
+        print(f"   http://{args.bind}:{args.port}{route} -> {served.path}{note}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -74,16 +74,497 @@ echo ""
 info "Test 3: Checking Python syntax..."
 python3 -m py_compile "$SCRIPT_DIR/generate_manifest.py" && pass "generate_manifest.py syntax OK" || fail "Syntax error in generate_manifest.py"
 python3 -m py_compile "$SCRIPT_DIR/validate_manifest.py" && pass "validate_manifest.py syntax OK" || fail "Syntax error in validate_manifest.py"
+python3 -m py_compile "$SCRIPT_DIR/mirror_manifest.py" && pass "mirror_manifest.py syntax OK" || fail "Syntax error in mirror_manifest.py"
+python3 -m py_compile "$SCRIPT_DIR/archive_inspector.py" && pass "archive_inspector.py syntax OK" || fail "Syntax error in archive_inspector.py"
+python3 -m py_compile "$SCRIPT_DIR/aggregate_buckets.py" && pass "aggregate_buckets.py syntax OK" || fail "Syntax error in aggregate_buckets.py"
+python3 -m py_compile "$SCRIPT_DIR/history_store.py" && pass "history_store.py syntax OK" || fail "Syntax error in history_store.py"
+python3 -m py_compile "$SCRIPT_DIR/resolver.py" && pass "resolver.py syntax OK" || fail "Syntax error in resolver.py"
+python3 -m py_compile "$SCRIPT_DIR/coverage_index.py" && pass "coverage_index.py syntax OK" || fail "Syntax error in coverage_index.py"
+python3 -m py_compile "$SCRIPT_DIR/serve_manifest.py" && pass "serve_manifest.py syntax OK" || fail "Syntax error in serve_manifest.py"
+python3 -m py_compile "$SCRIPT_DIR/loadtest_serve.py" && pass "loadtest_serve.py syntax OK" || fail "Syntax error in loadtest_serve.py"
+python3 -m py_compile "$SCRIPT_DIR/atomic_json.py" && pass "atomic_json.py syntax OK" || fail "Syntax error in atomic_json.py"
 
 # Test 4: Test generate_manifest.py --help
 echo ""
 info "Test 4: Testing script help..."
 python3 "$SCRIPT_DIR/generate_manifest.py" --help > /dev/null && pass "generate_manifest.py --help works" || fail "generate_manifest.py --help failed"
 python3 "$SCRIPT_DIR/validate_manifest.py" --help > /dev/null && pass "validate_manifest.py --help works" || fail "validate_manifest.py --help failed"
+python3 "$SCRIPT_DIR/mirror_manifest.py" --help > /dev/null && pass "mirror_manifest.py --help works" || fail "mirror_manifest.py --help failed"
+python3 "$SCRIPT_DIR/archive_inspector.py" --help > /dev/null && pass "archive_inspector.py --help works" || fail "archive_inspector.py --help failed"
+python3 "$SCRIPT_DIR/aggregate_buckets.py" --help > /dev/null && pass "aggregate_buckets.py --help works" || fail "aggregate_buckets.py --help failed"
+python3 "$SCRIPT_DIR/history_store.py" --help > /dev/null && pass "history_store.py --help works" || fail "history_store.py --help failed"
+python3 "$SCRIPT_DIR/resolver.py" --help > /dev/null && pass "resolver.py --help works" || fail "resolver.py --help failed"
+python3 "$SCRIPT_DIR/coverage_index.py" --help > /dev/null && pass "coverage_index.py --help works" || fail "coverage_index.py --help failed"
+python3 "$SCRIPT_DIR/serve_manifest.py" --help > /dev/null && pass "serve_manifest.py --help works" || fail "serve_manifest.py --help failed"
+python3 "$SCRIPT_DIR/loadtest_serve.py" --help > /dev/null && pass "loadtest_serve.py --help works" || fail "loadtest_serve.py --help failed"
+
+# Test 5: Inspect archives served locally with Range support
+echo ""
+info "Test 5: Testing archive inspection and mirroring..."
+ARCHIVE_DIR=$(mktemp -d)
+if python3 - "$SCRIPT_DIR" "$ARCHIVE_DIR" > /dev/null << 'PYEOF'
+import io, os, re, sys, tarfile, threading, zipfile
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, sys.argv[1])
+from archive_inspector import ArchiveInspector, ZIP_INITIAL_TAIL
+
+work = sys.argv[2]
+payload = os.urandom(256 * 1024)  # incompressible, so the archive dwarfs its tail
+
+zip_path = os.path.join(work, "tool-linux.zip")
+with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+    for name, mode in (("tool-1.0/tool", 0o755), ("tool-1.0/README.md", 0o644),
+                       ("tool-1.0/data.bin", 0o644), ("tool-1.0/tool.exe", 0o644)):
+        info = zipfile.ZipInfo(name)
+        info.create_system = 3
+        info.external_attr = (0o100000 | mode) << 16
+        archive.writestr(info, payload if name.endswith(".bin") else b"\x7fELF")
+
+tar_path = os.path.join(work, "tool-linux.tar.gz")
+with tarfile.open(tar_path, "w:gz") as archive:
+    for name, mode, data in (("./tool-1.0/tool", 0o755, b"\x7fELF"),
+                             ("./tool-1.0/LICENSE", 0o644, b"MIT")):
+        info = tarfile.TarInfo(name)
+        info.mode, info.size = mode, len(data)
+        archive.addfile(info, io.BytesIO(data))
+
+class RangeHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with open(os.path.join(work, self.path.lstrip("/")), "rb") as f:
+            data = f.read()
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            first, last = match.groups()
+            if not first:
+                start, end = max(0, len(data) - int(last)), len(data) - 1
+            else:
+                start, end = int(first), min(int(last or len(data) - 1), len(data) - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+            data = data[start:end + 1]
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base = f"http://127.0.0.1:{server.server_address[1]}"
+
+zip_size = os.path.getsize(zip_path)
+inspector = ArchiveInspector()
+binaries = inspector.inspect(f"{base}/tool-linux.zip", zip_size)
+assert sorted(b["path"] for b in binaries) == ["tool-1.0/tool", "tool-1.0/tool.exe"], binaries
+assert inspector.bytes_read <= ZIP_INITIAL_TAIL < zip_size, inspector.bytes_read
+
+inspector = ArchiveInspector()
+binaries = inspector.inspect(f"{base}/tool-linux.tar.gz", os.path.getsize(tar_path))
+assert binaries == [{"name": "tool", "path": "tool-1.0/tool"}], binaries
+
+# One inspector shared across threads counts every byte exactly once
+single = ArchiveInspector()
+single.inspect(f"{base}/tool-linux.zip", zip_size)
+single.inspect(f"{base}/tool-linux.tar.gz", os.path.getsize(tar_path))
+shared = ArchiveInspector()
+jobs = [(f"{base}/tool-linux.zip", zip_size),
+        (f"{base}/tool-linux.tar.gz", os.path.getsize(tar_path))] * 8
+with ThreadPoolExecutor(max_workers=8) as pool:
+    list(pool.map(lambda job: shared.inspect(*job), jobs))
+assert shared.bytes_read == single.bytes_read * 8, (shared.bytes_read, single.bytes_read)
+
+server.shutdown()
+PYEOF
+then
+    pass "Archive inspector lists binaries and reads only the zip tail"
+else
+    fail "Archive inspection failed"
+fi
+
+# Mirror: mutable script URLs are revalidated, changed content is downloaded again
+if python3 - "$SCRIPT_DIR" "$ARCHIVE_DIR" > /dev/null << 'PYEOF'
+import os, sys, threading
+sys.path.insert(0, sys.argv[1])
+from mirror_manifest import AssetStore, MirrorBuilder
+from serve_manifest import ManifestServer
+
+work = sys.argv[2]
+script_path = os.path.join(work, "install.sh")
+with open(script_path, "w") as f:
+    f.write("echo v1\n")
+
+server = ManifestServer(("127.0.0.1", 0), [script_path])
+threading.Thread(target=server.serve_forever, daemon=True).start()
+url = f"http://127.0.0.1:{server.server_address[1]}/install.sh"
+manifest = {"packages": [], "scripts": [{"name": "install", "url": url, "script_type": "bash"}]}
+
+def mirror():
+    store = AssetStore(os.path.join(work, "mirror"))
+    result = MirrorBuilder(store, "http://mirror.lan").build(manifest)
+    store.save()
+    path = result["scripts"][0]["url"].replace("http://mirror.lan/", "")
+    with open(os.path.join(work, "mirror", path)) as f:
+        return f.read()
+
+assert mirror() == "echo v1\n"
+assert mirror() == "echo v1\n"  # 304: reused
+with open(script_path + ".tmp", "w") as f:
+    f.write("echo v2\n")  # same size, new content
+os.replace(script_path + ".tmp", script_path)
+assert mirror() == "echo v2\n"
+server.shutdown()
+PYEOF
+then
+    pass "Mirror revalidates mutable script URLs"
+else
+    fail "Mirror served a stale script"
+fi
+rm -rf "$ARCHIVE_DIR"
+
+# Test 6: Generator behaviour against a stubbed GitHub API (no network)
+echo ""
+info "Test 6: Testing generator with a stubbed API..."
+STUB_DIR=$(mktemp -d)
+cat > "$STUB_DIR/stub_github.py" << 'PYEOF'
+"""Stubbed GitHub API for the offline generator tests"""
+import sys
+sys.path.insert(0, sys.argv[1])
+import generate_manifest as gm
+
+gm.RATE_LIMIT_DELAY = 0
+gm.RETRY_DELAY = 0
+gm.MAX_RETRIES = 1
+
+
+class StubAPI:
+    """Answers get_repo_info / get_latest_release; calls lists the releases fetched"""
+
+    def __init__(self, releases):
+        self.releases = releases  # owner/repo -> release, or an exception to raise
+        self.calls = []
+
+    def get_repo_info(self, owner, repo):
+        return {"name": repo, "description": "", "html_url": f"https://github.com/{owner}/{repo}",
+                "homepage": None, "license": None}
+
+    def get_latest_release(self, owner, repo):
+        self.calls.append(f"{owner}/{repo}")
+        release = self.releases[f"{owner}/{repo}"]
+        if isinstance(release, Exception):
+            raise release
+        return release
+
+    def list_releases(self, owner, repo, max_releases, cache=None):
+        latest = self.get_latest_release(owner, repo)
+        return [latest] if latest else []
+
+    def check_rate_limit(self):
+        pass
+
+
+def release(repo, tag="v1.0.0", names=None):
+    names = names or [f"{repo}-x86_64-unknown-linux-musl.tar.gz"]
+    return {"tag_name": tag, "published_at": "2024-01-01T00:00:00Z", "assets": [
+        {"name": name, "size": 1000, "browser_download_url": f"https://example.com/{tag}/{name}"}
+        for name in names
+    ]}
+
+
+def generator(api, cache_dir, **kwargs):
+    gen = gm.ManifestGenerator(cache_dir=cache_dir, **kwargs)
+    gen.api = api
+    return gen
+
+
+def write_sources(path, repos):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(f"https://github.com/{repo}\n" for repo in repos))
+PYEOF
+
+cd "$STUB_DIR"
+
+# Added repos that fail are fetched again by the next changed-only run
+if python3 - "$SCRIPT_DIR" > /dev/null << 'PYEOF'
+import json
+from stub_github import StubAPI, gm, generator, release, write_sources
+
+api = StubAPI({"o/a": release("a"), "o/b": gm.TransientError("boom"), "o/c": release("c")})
+write_sources("sources.txt", ["o/a"])
+generator(api, "cache").generate("sources.txt", "", "manifest.json")
+
+write_sources("sources.txt", ["o/a", "o/b", "o/c"])
+generator(api, "cache").generate_changed("sources.txt", "", "manifest.json")
+names = [pkg["name"] for pkg in json.load(open("manifest.json"))["packages"]]
+assert names == ["a", "c"], names
+
+api.releases["o/b"] = release("b")
+api.calls.clear()
+generator(api, "cache").generate_changed("sources.txt", "", "manifest.json")
+assert api.calls == ["o/b"], api.calls
+names = [pkg["name"] for pkg in json.load(open("manifest.json"))["packages"]]
+assert names == ["a", "c", "b"], names
+PYEOF
+then
+    pass "Failed added repos are retried by the next changed-only run"
+else
+    fail "Changed-only run lost a failed added repo"
+fi
+
+# Size only decides between archive formats of the same build
+if python3 - "$SCRIPT_DIR" > /dev/null << 'PYEOF'
+from stub_github import gm, release
+
+generator = gm.ManifestGenerator(cache_dir="cache")
+deno = release("deno", names=["deno-x86_64-unknown-linux-gnu.zip", "denort-x86_64-unknown-linux-gnu.zip"])
+deno["assets"][1]["size"] = 500  # runtime-only build, smaller but not the same build
+platforms, _ = generator.select_platform_assets(deno["assets"])
+assert platforms["linux-x86_64"]["url"].endswith("/deno-x86_64-unknown-linux-gnu.zip"), platforms
+
+tool = release("tool", names=["tool-x86_64-unknown-linux-musl.zip", "tool-x86_64-unknown-linux-musl.tar.xz"])
+tool["assets"][1]["size"] = 500
+platforms, _ = generator.select_platform_assets(tool["assets"])
+assert platforms["linux-x86_64"]["url"].endswith(".tar.xz"), platforms
+PYEOF
+then
+    pass "Asset selection keeps deno over the smaller denort build"
+else
+    fail "Asset selection picked a different build by size"
+fi
+
+# A budgeted run never shrinks the manifest, even when refreshes come back empty
+if python3 - "$SCRIPT_DIR" > /dev/null << 'PYEOF'
+import json
+from stub_github import StubAPI, generator, release, write_sources
+
+api = StubAPI({repo: release(repo[2:]) for repo in ("o/d", "o/e", "o/f")})
+write_sources("budget.txt", list(api.releases))
+generator(api, "budget-cache").generate("budget.txt", "", "budget.json")
+
+for repo in api.releases:
+    api.releases[repo] = RuntimeError("partial result")  # empty, not failed or negative
+api.calls.clear()
+generator(api, "budget-cache").generate("budget.txt", "", "budget.json", budget=2)
+assert len(api.calls) == 2, api.calls
+names = [pkg["name"] for pkg in json.load(open("budget.json"))["packages"]]
+assert names == ["d", "e", "f"], names
+PYEOF
+then
+    pass "Budgeted refresh keeps every previous package"
+else
+    fail "Budgeted refresh dropped packages"
+fi
+
+if python3 "$SCRIPT_DIR/generate_manifest.py" --budget abc 2>&1 | grep -q "error: argument --budget"; then
+    pass "Invalid --budget is a usage error"
+else
+    fail "Invalid --budget not reported as a usage error"
+fi
+
+# Release feeds: Atom parsing, and which repos --check-feeds refreshes
+if python3 - "$SCRIPT_DIR" > /dev/null << 'PYEOF'
+import io, json, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from stub_github import StubAPI, gm, generator, release, write_sources
+
+
+def feed(*tags, updated="2024-01-01T00:00:00Z"):
+    entries = "".join(
+        f'<entry><title>{tag}</title><link rel="alternate" type="text/html" '
+        f'href="https://github.com/o/r/releases/tag/{tag}"/><updated>{updated}</updated></entry>'
+        for tag in tags
+    )
+    return f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'.encode()
+
+
+checker = gm.ReleaseFeedChecker(gm.RefreshState("feeds-state.json"))
+assert checker.parse_newest_tag(io.BytesIO(feed("v2.0.0", "v1.0.0"))) == "v2.0.0"
+assert checker.parse_newest_tag(io.BytesIO(feed("pkg/v1.2"))) == "pkg/v1.2"
+assert checker.parse_newest_tag(io.BytesIO(feed("pkg%2Fv1.2"))) == "pkg/v1.2"
+assert checker.parse_newest_tag(io.BytesIO(feed())) is None
+assert checker.parse_newest_entry(io.BytesIO(feed("v3", updated="T"))) == ("v3", "T")
+
+feeds = {"/o/a/releases.atom": feed("v1.0.0"), "/o/b/releases.atom": feed("v2.0.0")}
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = feeds.get(self.path)
+        self.send_response(200 if body else 500)  # o/c: feed check fails
+        self.send_header("Content-Length", str(len(body or b"")))
+        self.end_headers()
+        self.wfile.write(body or b"")
+
+    def log_message(self, format, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+gm.GITHUB_WEB_BASE = f"http://127.0.0.1:{server.server_address[1]}"
+
+api = StubAPI({repo: release(repo[2:]) for repo in ("o/a", "o/b", "o/c")})
+write_sources("feeds.txt", list(api.releases))
+generator(api, "feeds-cache").generate("feeds.txt", "", "feeds.json")
+
+# First --check-feeds run: no feed tags yet, compared with the manifest's tags
+api.releases["o/b"] = release("b", tag="v2.0.0")
+api.calls.clear()
+generator(api, "feeds-cache").generate("feeds.txt", "", "feeds.json", check_feeds=True)
+assert api.calls == ["o/b", "o/c"], api.calls  # unchanged a skipped, failed feed refreshed
+packages = {pkg["name"]: pkg for pkg in json.load(open("feeds.json"))["packages"]}
+assert sorted(packages) == ["a", "b", "c"], packages
+assert "/v2.0.0/" in packages["b"]["platforms"]["linux-x86_64"]["url"], packages["b"]
+
+# no_assets: skipped while the release is unchanged, retried once assets are uploaded
+feeds["/o/n/releases.atom"] = feed("v1.0.0")
+api.releases["o/n"] = release("n", names=["n-src.tar.gz"])
+write_sources("negative.txt", ["o/n"])
+for _ in range(2):
+    api.calls.clear()
+    generator(api, "negative-cache").generate("negative.txt", "", "negative.json")
+assert api.calls == [], api.calls
+feeds["/o/n/releases.atom"] = feed("v1.0.0", updated="2024-01-02T00:00:00Z")
+api.releases["o/n"] = release("n")
+generator(api, "negative-cache").generate("negative.txt", "", "negative.json")
+assert api.calls == ["o/n"], api.calls
+
+# no_releases from /releases/latest does not skip a --history-depth run
+api.releases["o/p"] = gm.NotFoundError("Not Found")
+write_sources("negative.txt", ["o/p"])
+generator(api, "negative-cache").generate("negative.txt", "", "negative.json")
+api.releases["o/p"] = release("p", tag="v0.1.0-rc1")
+api.calls.clear()
+generator(api, "negative-cache", history_depth=5).generate("negative.txt", "", "negative.json")
+assert api.calls == ["o/p"], api.calls
+server.shutdown()
+PYEOF
+then
+    pass "Release feeds drive refreshes and negative cache retries"
+else
+    fail "Release feed check refreshed the wrong repos"
+fi
+
+# History store: releases without usable assets are recorded, missing sizes print as '-'
+if python3 - "$SCRIPT_DIR" > /dev/null << 'PYEOF'
+import subprocess, sys
+from stub_github import StubAPI, generator, release, write_sources
+from history_store import HistoryStore
+
+api = StubAPI({"o/g": release("g"), "o/h": release("h", names=["h-src.tar.gz"])})
+write_sources("history.txt", list(api.releases))
+gen = generator(api, "history-cache", history_db="history.db")
+gen.generate("history.txt", "", "history.json")
+gen.close()
+
+store = HistoryStore("history.db")
+tags = store.conn.execute("SELECT repo, tag FROM releases ORDER BY repo").fetchall()
+assert [tuple(row) for row in tags] == [("o/g", "v1.0.0"), ("o/h", "v1.0.0")], tags
+with store.conn:
+    store.conn.execute("UPDATE selections SET size = NULL")
+store.close()
+
+out = subprocess.run([sys.executable, f"{sys.argv[1]}/history_store.py", "history.db",
+                      "size-trend", "g", "linux-x86_64"], capture_output=True, text=True)
+assert out.returncode == 0 and out.stdout.split()[-1] == "-", out
+missing = subprocess.run([sys.executable, f"{sys.argv[1]}/history_store.py", "missing.db",
+                          "slowest"], capture_output=True, text=True)
+assert missing.returncode == 1, missing
+PYEOF
+then
+    pass "History store records every observed release"
+else
+    fail "History store check failed"
+fi
+
+# Coverage queries ignore an index older than its manifest
+if python3 - "$SCRIPT_DIR" > /dev/null << 'PYEOF'
+import json, os, subprocess, sys
+from stub_github import gm
+from coverage_index import CoverageIndex, coverage_path
+
+manifest = {"packages": [{"name": "old", "platforms": {"linux-x86_64": {}}}]}
+gm.write_json_atomic("coverage.json", manifest)
+gm.write_json_atomic(coverage_path("coverage.json"), CoverageIndex.from_manifest(manifest).to_dict())
+manifest["packages"].append({"name": "new", "platforms": {"linux-x86_64": {}}})
+gm.write_json_atomic("coverage.json", manifest)
+stamp = os.path.getmtime(coverage_path("coverage.json"))
+os.utime("coverage.json", (stamp + 10, stamp + 10))
+
+out = subprocess.run([sys.executable, f"{sys.argv[1]}/coverage_index.py", "-m", "coverage.json",
+                      "having", "linux-x86_64"], capture_output=True, text=True)
+assert out.returncode == 0 and "   new" in out.stdout.splitlines(), out.stdout
+PYEOF
+then
+    pass "Coverage queries ignore a stale index"
+else
+    fail "Coverage queries answered from a stale index"
+fi
+
+# Token pool: rate-limited tokens fail over; secondary limits only bench for Retry-After
+if python3 - "$SCRIPT_DIR" > /dev/null << 'PYEOF'
+import io, time
+from email.message import Message
+from urllib.error import HTTPError
+from stub_github import gm
+
+
+class Response(io.BytesIO):
+    def __init__(self, remaining):
+        super().__init__(b"{}")
+        self.headers = Message()
+        self.headers["X-RateLimit-Remaining"] = str(remaining)
+
+
+limits = {}  # token -> (status, headers, body) of its rate limit response
+
+
+def fake_urlopen(req, timeout=30):
+    token = req.get_header("Authorization").split()[1]
+    if token not in limits:
+        return Response(4000)
+    status, fields, body = limits[token]
+    headers = Message()
+    for name, value in fields.items():
+        headers[name] = value
+    raise HTTPError(req.full_url, status, "limited", headers, io.BytesIO(body))
+
+
+gm.urlopen = fake_urlopen
+reset = str(int(time.time()) + 3600)
+api = gm.GitHubAPI(tokens=["a", "b"])
+a, b = api.tokens.states
+
+# Primary limit (429, quota used up): a is benched until its reset, b serves
+limits["a"] = (429, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}, b"API rate limit exceeded")
+api._make_request("https://api.github.com/x")
+assert a.remaining == 0 and a.reset == float(reset) and b.remaining == 4000
+assert api.breaker.failures.get("api.github.com", 0) == 0
+
+# Secondary limit (403 + Retry-After, quota left): a keeps its quota and returns soon
+a.remaining, a.reset, b.remaining = 4500, None, 10
+limits["a"] = (403, {"X-RateLimit-Remaining": "4500", "Retry-After": "30"}, b"secondary rate limit")
+api._make_request("https://api.github.com/x")
+assert a.remaining == 4499 and a.reset is None and 0 < a.blocked_until - time.time() <= 30  # one reserved
+a.blocked_until = time.time() - 1  # Retry-After elapsed
+del limits["a"]
+assert api.tokens.acquire() is a
+PYEOF
+then
+    pass "Token pool fails over and honours Retry-After"
+else
+    fail "Token pool rate limit handling failed"
+fi
+
+cd /
+rm -rf "$STUB_DIR"
 
-# Test 5: Test with example sources
+# Test 7: Test with example sources
 echo ""
-info "Test 5: Testing manifest generation..."
+info "Test 7: Testing manifest generation..."
 
 # Create test directory
 TEST_DIR=$(mktemp -d)
@@ -105,18 +586,18 @@ else
     fail "Manifest generation failed"
 fi
 
-# Test 6: Validate generated manifest
+# Test 8: Validate generated manifest
 echo ""
-info "Test 6: Testing manifest validation..."
+info "Test 8: Testing manifest validation..."
 if python3 "$SCRIPT_DIR/validate_manifest.py" manifest.json 2>&1 | grep -q "Manifest is valid"; then
     pass "Manifest validation succeeded"
 else
     fail "Manifest validation failed"
 fi
 
-# Test 7: Check manifest structure
+# Test 9: Check manifest structure
 echo ""
-info "Test 7: Checking manifest structure..."
+info "Test 9: Checking manifest structure..."
 
 # Check if manifest is valid JSON
 if python3 -c "import json; json.load(open('manifest.json'))" 2>/dev/null; then
@@ -146,9 +627,9 @@ else
     fail "Packages missing required fields"
 fi
 
-# Test 8: Test invalid manifest
+# Test 10: Test invalid manifest
 echo ""
-info "Test 8: Testing validation with invalid manifest..."
+info "Test 10: Testing validation with invalid manifest..."
 
 # Create invalid manifest
 echo '{"invalid": "format"}' > invalid.json
@@ -159,9 +640,9 @@ else
     warn "Validation should reject invalid manifest"
 fi
 
-# Test 9: Check example manifest
+# Test 11: Check example manifest
 echo ""
-info "Test 9: Checking example manifest..."
+info "Test 11: Checking example manifest..."
 
 if [ -f "$PROJECT_ROOT/examples/manifest.json" ]; then
     if python3 "$SCRIPT_DIR/validate_manifest.py" "$PROJECT_ROOT/examples/manifest.json" 2>&1 | grep -q "Manifest is valid"; then
@@ -173,9 +654,9 @@ else
     warn "Example manifest not found"
 fi
 
-# Test 10: Check workflow file
+# Test 12: Check workflow file
 echo ""
-info "Test 10: Checking workflow file..."
+info "Test 12: Checking workflow file..."
 
 WORKFLOW_FILE="$PROJECT_ROOT/workflows/update-manifest.yml"
 if [ -f "$WORKFLOW_FILE" ]; then
@@ -216,6 +697,8 @@ echo "📊 Test Summary:"
 echo "   • Python version: OK"
 echo "   • Script files: OK"
 echo "   • Syntax check: OK"
+echo "   • Archive inspection: OK"
+echo "   • Generator (stubbed API): OK"
 echo "   • Manifest generation: OK"
 echo "   • Manifest validation: OK"
 echo "   • Workflow configuration: OK"
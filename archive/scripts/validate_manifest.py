@@ -5,9 +5,12 @@ Wenget Bucket Manifest Validator
 Validates manifest.json format and content
 """
 
+import os
 import json
 import sys
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+from coverage_index import CoverageIndex, coverage_path
 
 
 class ManifestValidator:
@@ -16,11 +19,17 @@ class ManifestValidator:
     REQUIRED_PACKAGE_FIELDS = ["name", "description", "repo", "platforms"]
     REQUIRED_PLATFORM_FIELDS = ["url", "size"]
 
-    def __init__(self, manifest_file: str):
+    def __init__(self, manifest_file: str, manifest_obj: Optional[Any] = None):
+        """
+        manifest_file names the manifest; pass manifest_obj to validate an
+        already parsed manifest (manifest_file is then only used as a label).
+        """
         self.manifest_file = manifest_file
+        self.manifest_obj = manifest_obj
         self.errors = []
         self.warnings = []
         self.packages = []
+        self.coverage = CoverageIndex([], {})
 
     def validate(self) -> bool:
         """Validate manifest file"""
@@ -41,6 +50,9 @@ class ManifestValidator:
         # Check for duplicates
         self._check_duplicates()
 
+        # Check the coverage index written next to the manifest
+        self._check_coverage_index()
+
         # Print results
         self._print_results()
 
@@ -49,8 +61,11 @@ class ManifestValidator:
     def _load_manifest(self) -> bool:
         """Load and parse manifest file (support object with packages/last_updated)"""
         try:
-            with open(self.manifest_file, "r", encoding="utf-8") as f:
-                manifest_obj = json.load(f)
+            if self.manifest_obj is not None:
+                manifest_obj = self.manifest_obj
+            else:
+                with open(self.manifest_file, "r", encoding="utf-8") as f:
+                    manifest_obj = json.load(f)
             print(f"✓ Loaded {self.manifest_file}")
             if isinstance(manifest_obj, dict):
                 if "packages" in manifest_obj:
@@ -186,6 +201,17 @@ class ManifestValidator:
             if not isinstance(checksum, str):
                 self.warnings.append(f"{pkg_id}/{platform_id}: Invalid checksum format")
 
+        # Validate binaries (optional)
+        if "binaries" in platform:
+            binaries = platform["binaries"]
+            if not isinstance(binaries, list) or not all(
+                isinstance(b, dict)
+                and isinstance(b.get("name"), str)
+                and isinstance(b.get("path"), str)
+                for b in binaries
+            ):
+                self.warnings.append(f"{pkg_id}/{platform_id}: Invalid binaries format")
+
     def _check_duplicates(self):
         """Check for duplicate package names"""
         names = [pkg.get("name") for pkg in self.packages if "name" in pkg]
@@ -194,6 +220,28 @@ class ManifestValidator:
         for dup in duplicates:
             self.errors.append(f"Duplicate package name: {dup}")
 
+    def _check_coverage_index(self):
+        """Warn if <manifest>.coverage.json does not match the manifest"""
+        packages = self.packages if isinstance(self.packages, list) else []
+        self.coverage = CoverageIndex.from_manifest([
+            pkg for pkg in packages
+            if isinstance(pkg, dict) and "name" in pkg and isinstance(pkg.get("platforms"), dict)
+        ])
+        index_file = coverage_path(self.manifest_file)
+        if self.manifest_obj is not None or not os.path.exists(index_file):
+            return
+
+        try:
+            stored = CoverageIndex.load(index_file)
+        except (OSError, ValueError, KeyError) as e:
+            self.warnings.append(f"Cannot read coverage index {index_file}: {e}")
+            return
+
+        expected = {name: self.coverage.platforms_of(name) for name in self.coverage.packages}
+        actual = {name: stored.platforms_of(name) for name in stored.packages}
+        if expected != actual:
+            self.warnings.append(f"Coverage index {index_file} is out of date")
+
     def _print_results(self):
         """Print validation results"""
         print("\n" + "=" * 50)
@@ -213,10 +261,9 @@ class ManifestValidator:
             print(f"   • {len(self.packages)} package(s)")
 
             # Count total platforms
-            total_platforms = sum(
-                len(pkg.get("platforms", {})) for pkg in self.packages
-            )
-            print(f"   • {total_platforms} platform binaries")
+            print(f"   • {self.coverage.total()} platform binaries")
+            for platform, count in sorted(self.coverage.counts().items()):
+                print(f"     {platform}: {count}")
 
         print()
 